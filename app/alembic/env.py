@@ -5,7 +5,9 @@ from logging.config import fileConfig
 from pathlib import Path
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from alembic.script import ScriptDirectory
+from sqlalchemy import engine_from_config, inspect, pool
+from sqlalchemy.engine import Connection
 
 from observatory.db.base import Base
 from observatory.db import models  # noqa: F401  # ensure models are registered
@@ -20,6 +22,24 @@ config.set_main_option("sqlalchemy.url", settings.database_url)
 target_metadata = Base.metadata
 
 
+def should_create_baseline(connection: Connection) -> bool:
+    """Return True when upgrading an empty database all the way to head.
+
+    Running every revision from scratch mostly replays data fixups against
+    empty tables, so a fresh database is built straight from the models (the
+    final schema) and stamped at head instead. Pass ``-x baseline=false`` to
+    force the full revision chain.
+    """
+    if context.get_x_argument(as_dictionary=True).get("baseline", "true").lower() == "false":
+        return False
+    # Alembic hands env.py the resolved target revision(s), never "head"
+    target = context.get_revision_argument()
+    targets = set(target) if isinstance(target, (list, tuple)) else {target}
+    if targets != set(ScriptDirectory.from_config(config).get_heads()):
+        return False
+    return not inspect(connection).get_table_names()
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
@@ -36,8 +56,24 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # Data-fixup migrations rewrite whole tables inside one transaction
+            # per revision; fsync less often on commit (unlike OFF, NORMAL
+            # still syncs at the points that keep the file consistent) and
+            # keep temp b-trees (GROUP BY, sorts, temp indexes) in memory.
+            # Both settings are per-connection and are discarded when the
+            # NullPool closes it.
+            connection.exec_driver_sql("PRAGMA synchronous=NORMAL")
+            connection.exec_driver_sql("PRAGMA temp_store=MEMORY")
+            connection.commit()
+
         context.configure(connection=connection, target_metadata=target_metadata)
 
+        if should_create_baseline(connection):
+            target_metadata.create_all(connection)
+            context.get_context().stamp(ScriptDirectory.from_config(config), "heads")
+            connection.commit()
+
         with context.begin_transaction():
             context.run_migrations()
 
@@ -49,5 +85,6 @@ def main() -> None:
         run_migrations_online()
 
 
-if __name__ == "__main__":  # pragma: no cover
-    main()
+# Alembic imports this file as a plain module (never as __main__), so the
+# migrations have to start at import time
+main()
@@ -1,4 +1,9 @@
-"""Initial schema with alliances, players, screenshots, and stats."""
+"""Initial schema with alliances, players, screenshots, and stats.
+
+Only tables (and their inline unique constraints) are created here; secondary
+indexes follow in 20231112_000001b so any seed data loaded between the two
+revisions doesn't pay for index maintenance on every insert.
+"""
 from __future__ import annotations
 
 from alembic import op
@@ -32,7 +37,6 @@ def upgrade() -> None:
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.UniqueConstraint("alliance_id", "name", name="uq_player_alliance_name"),
     )
-    op.create_index("ix_players_alliance_id", "players", ["alliance_id"])
 
     op.create_table(
         "screenshots",
@@ -54,7 +58,6 @@ def upgrade() -> None:
         sa.Column("error_message", sa.Text(), nullable=True),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
     )
-    op.create_index("ix_screenshots_status", "screenshots", ["status"])
 
     op.create_table(
         "player_power_history",
@@ -64,8 +67,6 @@ def upgrade() -> None:
         sa.Column("captured_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
         sa.UniqueConstraint("player_id", "captured_at", name="uq_power_capture"),
     )
-    op.create_index("ix_player_power_history_player_id", "player_power_history", ["player_id"])
-    op.create_index("ix_player_power_history_captured_at", "player_power_history", ["captured_at"])
 
     op.create_table(
         "player_furnace_history",
@@ -75,8 +76,6 @@ def upgrade() -> None:
         sa.Column("captured_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
         sa.UniqueConstraint("player_id", "captured_at", name="uq_furnace_capture"),
     )
-    op.create_index("ix_player_furnace_history_player_id", "player_furnace_history", ["player_id"])
-    op.create_index("ix_player_furnace_history_captured_at", "player_furnace_history", ["captured_at"])
 
     op.create_table(
         "event_stats",
@@ -88,29 +87,12 @@ def upgrade() -> None:
         sa.Column("payload", sa.JSON(), nullable=True),
         sa.Column("captured_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
     )
-    op.create_index("ix_event_stats_player_id", "event_stats", ["player_id"])
-    op.create_index("ix_event_stats_event_type", "event_stats", ["event_type"])
-    op.create_index("ix_event_stats_captured_at", "event_stats", ["captured_at"])
 
 
 def downgrade() -> None:
-    op.drop_index("ix_event_stats_captured_at", table_name="event_stats")
-    op.drop_index("ix_event_stats_event_type", table_name="event_stats")
-    op.drop_index("ix_event_stats_player_id", table_name="event_stats")
     op.drop_table("event_stats")
-
-    op.drop_index("ix_player_furnace_history_captured_at", table_name="player_furnace_history")
-    op.drop_index("ix_player_furnace_history_player_id", table_name="player_furnace_history")
     op.drop_table("player_furnace_history")
-
-    op.drop_index("ix_player_power_history_captured_at", table_name="player_power_history")
-    op.drop_index("ix_player_power_history_player_id", table_name="player_power_history")
     op.drop_table("player_power_history")
-
-    op.drop_index("ix_screenshots_status", table_name="screenshots")
     op.drop_table("screenshots")
-
-    op.drop_index("ix_players_alliance_id", table_name="players")
     op.drop_table("players")
-
     op.drop_table("alliances")
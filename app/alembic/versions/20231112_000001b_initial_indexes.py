@@ -0,0 +1,40 @@
+"""Secondary indexes for the initial schema.
+
+Split from 20231112_000001 so the tables exist before any index does: a data
+load run between the two revisions inserts into bare tables, and each index is
+then built once in bulk. Unique constraints stay inline in the table
+definitions because SQLite can only add them later by rebuilding the table.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20231112_000001b"
+down_revision = "20231112_000001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_players_alliance_id", "players", ["alliance_id"])
+    op.create_index("ix_screenshots_status", "screenshots", ["status"])
+    op.create_index("ix_player_power_history_player_id", "player_power_history", ["player_id"])
+    op.create_index("ix_player_power_history_captured_at", "player_power_history", ["captured_at"])
+    op.create_index("ix_player_furnace_history_player_id", "player_furnace_history", ["player_id"])
+    op.create_index("ix_player_furnace_history_captured_at", "player_furnace_history", ["captured_at"])
+    op.create_index("ix_event_stats_player_id", "event_stats", ["player_id"])
+    op.create_index("ix_event_stats_event_type", "event_stats", ["event_type"])
+    op.create_index("ix_event_stats_captured_at", "event_stats", ["captured_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_stats_captured_at", table_name="event_stats")
+    op.drop_index("ix_event_stats_event_type", table_name="event_stats")
+    op.drop_index("ix_event_stats_player_id", table_name="event_stats")
+    op.drop_index("ix_player_furnace_history_captured_at", table_name="player_furnace_history")
+    op.drop_index("ix_player_furnace_history_player_id", table_name="player_furnace_history")
+    op.drop_index("ix_player_power_history_captured_at", table_name="player_power_history")
+    op.drop_index("ix_player_power_history_player_id", table_name="player_power_history")
+    op.drop_index("ix_screenshots_status", table_name="screenshots")
+    op.drop_index("ix_players_alliance_id", table_name="players")
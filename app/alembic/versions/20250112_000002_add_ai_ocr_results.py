@@ -5,7 +5,7 @@ from alembic import op
 import sqlalchemy as sa
 
 revision = "20250112_000002"
-down_revision = "20231112_000001"
+down_revision = "20231112_000001b"
 branch_labels = None
 depends_on = None
 
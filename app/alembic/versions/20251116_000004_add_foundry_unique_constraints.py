@@ -17,24 +17,40 @@ depends_on = None
 
 
 def upgrade():
+    # Index the dedup keys first so the EXISTS probes below are index seeks
+    # rather than table scans; dropped once the unique constraints exist
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS tmp_foundry_signups_dedup
+        ON foundry_signups (foundry_event_id, player_id, id)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS tmp_foundry_results_dedup
+        ON foundry_results (foundry_event_id, player_id, id)
+    """)
+
     # Delete duplicate foundry_signups, keeping the earliest created_at for each (foundry_event_id, player_id)
-    # This is a SQLite-compatible approach
+    # A row is a duplicate if an older row (lower id) exists for the same key; the
+    # correlated EXISTS stops at the first match instead of building a NOT IN list
     op.execute("""
         DELETE FROM foundry_signups
-        WHERE id NOT IN (
-            SELECT MIN(id)
-            FROM foundry_signups
-            GROUP BY foundry_event_id, player_id
+        WHERE EXISTS (
+            SELECT 1
+            FROM foundry_signups AS older
+            WHERE older.foundry_event_id = foundry_signups.foundry_event_id
+              AND older.player_id = foundry_signups.player_id
+              AND older.id < foundry_signups.id
         )
     """)
 
     # Delete duplicate foundry_results, keeping the earliest created_at for each (foundry_event_id, player_id)
     op.execute("""
         DELETE FROM foundry_results
-        WHERE id NOT IN (
-            SELECT MIN(id)
-            FROM foundry_results
-            GROUP BY foundry_event_id, player_id
+        WHERE EXISTS (
+            SELECT 1
+            FROM foundry_results AS older
+            WHERE older.foundry_event_id = foundry_results.foundry_event_id
+              AND older.player_id = foundry_results.player_id
+              AND older.id < foundry_results.id
         )
     """)
 
@@ -52,6 +68,10 @@ def upgrade():
         ['foundry_event_id', 'player_id']
     )
 
+    # The unique constraints' indexes cover the same keys
+    op.execute("DROP INDEX IF EXISTS tmp_foundry_results_dedup")
+    op.execute("DROP INDEX IF EXISTS tmp_foundry_signups_dedup")
+
 
 def downgrade():
     # Remove unique constraints
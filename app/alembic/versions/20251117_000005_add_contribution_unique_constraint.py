@@ -19,21 +19,35 @@ depends_on = None
 def upgrade():
     # Normalize all existing snapshot_date and week_start_date to midnight UTC
     # This ensures that multiple uploads on the same day are properly deduplicated
+    # Rows that are already at midnight are skipped so they aren't rewritten
     op.execute("""
         UPDATE contribution_snapshots
         SET snapshot_date = datetime(date(snapshot_date)),
             week_start_date = datetime(date(week_start_date))
+        WHERE snapshot_date <> datetime(date(snapshot_date))
+           OR week_start_date <> datetime(date(week_start_date))
+    """)
+
+    # Index the dedup keys (after the rewrite above, so the UPDATE doesn't have
+    # to maintain it) so the EXISTS probe below is an index seek
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS tmp_contribution_snapshots_dedup
+        ON contribution_snapshots (alliance_id, player_id, week_start_date, snapshot_date, id)
     """)
 
     # Delete duplicate contribution_snapshots, keeping the earliest created_at for each
     # (alliance_id, player_id, week_start_date, snapshot_date)
-    # This is a SQLite-compatible approach
+    # A row is a duplicate if an older row (lower id) exists for the same key
     op.execute("""
         DELETE FROM contribution_snapshots
-        WHERE id NOT IN (
-            SELECT MIN(id)
-            FROM contribution_snapshots
-            GROUP BY alliance_id, player_id, week_start_date, snapshot_date
+        WHERE EXISTS (
+            SELECT 1
+            FROM contribution_snapshots AS older
+            WHERE older.alliance_id = contribution_snapshots.alliance_id
+              AND older.player_id = contribution_snapshots.player_id
+              AND older.week_start_date = contribution_snapshots.week_start_date
+              AND older.snapshot_date = contribution_snapshots.snapshot_date
+              AND older.id < contribution_snapshots.id
         )
     """)
 
@@ -44,6 +58,9 @@ def upgrade():
         ['alliance_id', 'player_id', 'week_start_date', 'snapshot_date']
     )
 
+    # The unique constraint's index covers the same keys
+    op.execute("DROP INDEX IF EXISTS tmp_contribution_snapshots_dedup")
+
 
 def downgrade():
     # Remove unique constraint
@@ -18,25 +18,25 @@ depends_on = None
 
 def upgrade():
     # Delete duplicate AC signups, keeping the one with highest ac_power for each
-    # (ac_event_id, player_id) combination
-    # This is a SQLite-compatible approach using subquery
+    # (ac_event_id, player_id) combination; ties keep the earliest id.
+    # A row is deleted if a better-ranked row exists for the same key, so a
+    # single pass leaves exactly one row per key.
+    # The temporary index matches that ranking so each probe is an index seek.
     op.execute("""
-        DELETE FROM ac_signups
-        WHERE id NOT IN (
-            SELECT MAX(id)
-            FROM ac_signups
-            GROUP BY ac_event_id, player_id
-            HAVING ac_power = MAX(ac_power)
-        )
+        CREATE INDEX IF NOT EXISTS tmp_ac_signups_dedup
+        ON ac_signups (ac_event_id, player_id, ac_power DESC, id)
     """)
-
-    # Clean up any remaining duplicates by keeping first id
     op.execute("""
         DELETE FROM ac_signups
-        WHERE id NOT IN (
-            SELECT MIN(id)
-            FROM ac_signups
-            GROUP BY ac_event_id, player_id
+        WHERE EXISTS (
+            SELECT 1
+            FROM ac_signups AS better
+            WHERE better.ac_event_id = ac_signups.ac_event_id
+              AND better.player_id = ac_signups.player_id
+              AND (
+                  better.ac_power > ac_signups.ac_power
+                  OR (better.ac_power = ac_signups.ac_power AND better.id < ac_signups.id)
+              )
         )
     """)
 
@@ -47,6 +47,9 @@ def upgrade():
         ['ac_event_id', 'player_id']
     )
 
+    # The unique constraint's index covers the same keys
+    op.execute("DROP INDEX IF EXISTS tmp_ac_signups_dedup")
+
 
 def downgrade():
     # Remove unique constraint
@@ -5,7 +5,7 @@ Revises: 20251119_000006
 Create Date: 2025-11-19
 
 """
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -45,18 +45,50 @@ def upgrade():
         ('alliance_power_snapshots', ['snapshot_date', 'recorded_at', 'created_at']),
     ]
 
-    # For each table and column, ensure timezone-aware format
+    # Build every (probe, update) pair up front; each table's datetime columns
+    # are rewritten by a single UPDATE so the table is scanned once instead of
+    # once per column.
+    statements = []
     for table_name, columns in tables_and_columns:
-        for column in columns:
-            # Add +00:00 timezone suffix if not present (assumes UTC)
-            # Skip if column is NULL
-            op.execute(f"""
-                UPDATE {table_name}
-                SET {column} = {column} || '+00:00'
-                WHERE {column} IS NOT NULL
-                  AND {column} NOT LIKE '%+%'
-                  AND {column} NOT LIKE '%Z'
-            """)
+        # A column needs the +00:00 suffix (assumes UTC) if it is set but has
+        # no timezone marker; NULL values are left alone
+        needs_tz = {
+            column: f"({column} IS NOT NULL AND {column} NOT LIKE '%+%' AND {column} NOT LIKE '%Z')"
+            for column in columns
+        }
+        assignments = ", ".join(
+            f"{column} = CASE WHEN {predicate} THEN {column} || '+00:00' ELSE {column} END"
+            for column, predicate in needs_tz.items()
+        )
+        needs_fix = " OR ".join(needs_tz.values())
+        statements.append((
+            f"SELECT 1 FROM {table_name} WHERE {needs_fix} LIMIT 1",
+            f"UPDATE {table_name} SET {assignments} WHERE {needs_fix}",
+        ))
+
+    # Offline (--sql) mode has no connection to probe, so emit every UPDATE
+    if context.is_offline_mode():
+        for _, update in statements:
+            op.execute(update)
+        return
+
+    # All statements share the revision's transaction on one connection. On
+    # SQLite they go straight to the driver, skipping SQLAlchemy's text()
+    # compilation; other drivers (pyformat paramstyle would trip over the
+    # LIKE wildcards) keep the compiled path.
+    bind = op.get_bind()
+
+    def run(sql):
+        if bind.dialect.name == 'sqlite':
+            return bind.exec_driver_sql(sql)
+        return bind.execute(sa.text(sql))
+
+    for probe, update in statements:
+        # Cheap probe first: skip the UPDATE (and its table scan) entirely for
+        # tables that are already clean, e.g. on repeat upgrades
+        if run(probe).first() is None:
+            continue
+        run(update)
 
 
 def downgrade():
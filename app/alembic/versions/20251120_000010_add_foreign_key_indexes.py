@@ -0,0 +1,66 @@
+"""Add indexes on foreign key columns that lacked one
+
+Revision ID: 20251120_000010
+Revises: 20251119_000009
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251120_000010'
+down_revision = '20251119_000009'
+branch_labels = None
+depends_on = None
+
+
+# ON DELETE CASCADE children of players/alliances on the event tables. These
+# tables were created from the ORM models (which declare index=True on every
+# FK column) rather than by a revision, so the indexes are only created when
+# missing; the names match what the models generate. bear_scores.bear_event_id
+# is led by idx_bear_scores_event_player (20251119_000009), so it needs none.
+CASCADE_FK_INDEXES = [
+    ('ix_bear_events_alliance_id', 'bear_events', 'alliance_id'),
+    ('ix_bear_scores_player_id', 'bear_scores', 'player_id'),
+    ('ix_foundry_events_alliance_id', 'foundry_events', 'alliance_id'),
+    ('ix_foundry_signups_foundry_event_id', 'foundry_signups', 'foundry_event_id'),
+    ('ix_foundry_signups_player_id', 'foundry_signups', 'player_id'),
+    ('ix_foundry_results_foundry_event_id', 'foundry_results', 'foundry_event_id'),
+    ('ix_foundry_results_player_id', 'foundry_results', 'player_id'),
+    ('ix_ac_events_alliance_id', 'ac_events', 'alliance_id'),
+    ('ix_ac_signups_ac_event_id', 'ac_signups', 'ac_event_id'),
+    ('ix_ac_signups_player_id', 'ac_signups', 'player_id'),
+    ('ix_contribution_snapshots_alliance_id', 'contribution_snapshots', 'alliance_id'),
+    ('ix_contribution_snapshots_player_id', 'contribution_snapshots', 'player_id'),
+]
+
+
+def upgrade():
+    # Users: deleting an alliance (or validating the FK) looks up referencing
+    # users by default_alliance_id, which is a full table scan without an index
+    op.create_index(
+        'ix_users_default_alliance_id',
+        'users',
+        ['default_alliance_id']
+    )
+
+    # Screenshots: ON DELETE CASCADE from alliances has to find every screenshot
+    # of the deleted alliance
+    op.create_index(
+        'ix_screenshots_alliance_id',
+        'screenshots',
+        ['alliance_id']
+    )
+
+    # Event tables: make sure every cascading FK has an index leading with it
+    for index_name, table_name, column in CASCADE_FK_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column})")
+
+
+def downgrade():
+    # CASCADE_FK_INDEXES are part of the model schema and normally pre-date this
+    # revision, so they are left in place
+    op.drop_index('ix_screenshots_alliance_id', table_name='screenshots')
+    op.drop_index('ix_users_default_alliance_id', table_name='users')
@@ -0,0 +1,42 @@
+"""Replace the screenshots status index with a partial index on unfinished work
+
+Revision ID: 20251120_000011
+Revises: 20251120_000010
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251120_000011'
+down_revision = '20251120_000010'
+branch_labels = None
+depends_on = None
+
+
+# Statuses are stored by enum name (SAEnum default). Almost every row ends up
+# SUCCEEDED, which no query looks up by status, so only index the rest.
+# Written as ORed equalities: SQLite only uses a partial index when a query's
+# WHERE term appears in the index predicate, so a plain status = 'FAILED'
+# matches this but would not imply an IN list.
+ACTIVE_STATUSES = sa.text("status = 'PENDING' OR status = 'PROCESSING' OR status = 'FAILED'")
+
+
+def upgrade():
+    op.drop_index('ix_screenshots_status', table_name='screenshots')
+
+    # created_at is included so "oldest pending first" is served from the index
+    op.create_index(
+        'ix_screenshots_status_active',
+        'screenshots',
+        ['status', 'created_at'],
+        sqlite_where=ACTIVE_STATUSES,
+        postgresql_where=ACTIVE_STATUSES,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_screenshots_status_active', table_name='screenshots')
+    op.create_index('ix_screenshots_status', 'screenshots', ['status'])
@@ -0,0 +1,55 @@
+"""Store JSON payload columns as JSONB on PostgreSQL
+
+Revision ID: 20251120_000012
+Revises: 20251120_000011
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20251120_000012'
+down_revision = '20251120_000011'
+branch_labels = None
+depends_on = None
+
+
+PAYLOAD_COLUMNS = [
+    ('event_stats', True),
+    ('ai_ocr_results', False),
+]
+
+
+def upgrade():
+    # SQLite stores JSON as text either way; only PostgreSQL has a binary JSONB
+    # type that avoids reparsing the payload on every read
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table_name, nullable in PAYLOAD_COLUMNS:
+        op.alter_column(
+            table_name,
+            'payload',
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=nullable,
+            postgresql_using='payload::jsonb',
+        )
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table_name, nullable in PAYLOAD_COLUMNS:
+        op.alter_column(
+            table_name,
+            'payload',
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=nullable,
+            postgresql_using='payload::json',
+        )
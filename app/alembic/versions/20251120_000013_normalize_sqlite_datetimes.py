@@ -0,0 +1,124 @@
+"""Normalize SQLite datetime text to fixed-width UTC ISO-8601
+
+Revision ID: 20251120_000013
+Revises: 20251120_000012
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251120_000013'
+down_revision = '20251120_000012'
+branch_labels = None
+depends_on = None
+
+
+# Same format TZDateTime writes on SQLite: always UTC, always microsecond
+# precision, so plain string comparison orders values chronologically.
+# strftime()'s %f stops at milliseconds, so only the seconds come from
+# strftime(); the fractional digits are copied from the stored text (offsets
+# are whole minutes and never change them) and padded to six.
+def utc_text(column):
+    tail = f"substr({column}, 20)"
+    offset = (
+        f"(CASE WHEN {tail} LIKE '%Z' THEN 'Z' "
+        f"WHEN substr({tail}, -6, 1) IN ('+', '-') AND substr({tail}, -3, 1) = ':' "
+        f"THEN substr({tail}, -6) ELSE '' END)"
+    )
+    fraction = (
+        f"(CASE WHEN substr({tail}, 1, 1) = '.' "
+        f"THEN substr({tail}, 2, length({tail}) - 1 - length({offset})) ELSE '' END)"
+    )
+    return (
+        f"(strftime('%Y-%m-%dT%H:%M:%S', substr({column}, 1, 19) || {offset}) "
+        f"|| '.' || substr({fraction} || '000000', 1, 6) || 'Z')"
+    )
+
+
+TABLES_AND_COLUMNS = [
+    ('users', ['created_at', 'last_login']),
+    ('alliances', ['created_at']),
+    ('players', ['created_at', 'updated_at']),
+    ('screenshots', ['processed_at', 'created_at']),
+    ('player_power_history', ['captured_at', 'created_at']),
+    ('player_furnace_history', ['captured_at', 'created_at']),
+    ('event_stats', ['captured_at']),
+    ('bear_events', ['started_at', 'ended_at', 'created_at']),
+    ('bear_scores', ['recorded_at', 'created_at']),
+    ('foundry_events', ['event_date', 'created_at']),
+    ('foundry_signups', ['recorded_at', 'created_at']),
+    ('foundry_results', ['recorded_at', 'created_at']),
+    ('ac_events', ['week_start_date', 'created_at']),
+    ('ac_signups', ['recorded_at', 'created_at']),
+    ('contribution_snapshots', ['week_start_date', 'snapshot_date', 'recorded_at', 'created_at']),
+    ('alliance_power_snapshots', ['snapshot_date', 'recorded_at', 'created_at']),
+]
+
+# Unique keys that include a datetime column: rows whose timestamps only differed
+# in formatting ('2025-11-19 00:00:00+00:00' vs '2025-11-19T00:00:00+00:00')
+# collapse onto the same key once normalized
+UNIQUE_KEYS_WITH_DATETIMES = [
+    ('player_power_history', ['player_id'], ['captured_at']),
+    ('player_furnace_history', ['player_id'], ['captured_at']),
+    ('contribution_snapshots', ['alliance_id', 'player_id'], ['week_start_date', 'snapshot_date']),
+]
+
+
+def upgrade():
+    # PostgreSQL stores real timestamptz values; only SQLite keeps datetimes as text
+    if op.get_context().dialect.name != 'sqlite':
+        return
+
+    # Drop rows that would violate a unique constraint after normalization,
+    # keeping the earliest id per key (same rule as the dedup migrations)
+    for table_name, plain_columns, datetime_columns in UNIQUE_KEYS_WITH_DATETIMES:
+        conditions = [f"older.{column} = {table_name}.{column}" for column in plain_columns]
+        conditions += [
+            f"{utc_text(f'older.{column}')} = {utc_text(f'{table_name}.{column}')}"
+            for column in datetime_columns
+        ]
+        op.execute(f"""
+            DELETE FROM {table_name}
+            WHERE EXISTS (
+                SELECT 1
+                FROM {table_name} AS older
+                WHERE {' AND '.join(conditions)}
+                  AND older.id < {table_name}.id
+            )
+        """)
+
+    # One set-based UPDATE per table; strftime() converts any offset to UTC.
+    # Values SQLite can't parse come back NULL from utc_text() and are kept as-is.
+    for table_name, columns in TABLES_AND_COLUMNS:
+        normalized = {column: utc_text(column) for column in columns}
+        assignments = ", ".join(
+            f"{column} = COALESCE({expr}, {column})" for column, expr in normalized.items()
+        )
+        needs_fix = " OR ".join(f"{column} <> {expr}" for column, expr in normalized.items())
+        op.execute(f"""
+            UPDATE {table_name}
+            SET {assignments}
+            WHERE {needs_fix}
+        """)
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'sqlite':
+        return
+
+    # Back to the explicit +00:00 suffix the previous TZDateTime wrote
+    for table_name, columns in TABLES_AND_COLUMNS:
+        assignments = ", ".join(
+            f"{column} = CASE WHEN {column} LIKE '%Z' "
+            f"THEN substr({column}, 1, length({column}) - 1) || '+00:00' ELSE {column} END"
+            for column in columns
+        )
+        needs_fix = " OR ".join(f"{column} LIKE '%Z'" for column in columns)
+        op.execute(f"""
+            UPDATE {table_name}
+            SET {assignments}
+            WHERE {needs_fix}
+        """)
@@ -0,0 +1,71 @@
+"""Store enum columns as plain VARCHAR instead of native PostgreSQL enum types
+
+Revision ID: 20251120_000014
+Revises: 20251120_000013
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20251120_000014'
+down_revision = '20251120_000013'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, enum type name, member names, server default)
+ENUM_COLUMNS = [
+    ('players', 'status', 'player_status',
+     ['ACTIVE', 'INACTIVE', 'RETIRED'], 'active'),
+    ('screenshots', 'detected_type', 'screenshot_type',
+     ['UNKNOWN', 'ALLIANCE_MEMBERS', 'CONTRIBUTION', 'AC_LANES', 'BEAR_EVENT', 'BEAR_OVERVIEW'], 'unknown'),
+    ('screenshots', 'status', 'screenshot_status',
+     ['PENDING', 'PROCESSING', 'SUCCEEDED', 'FAILED'], 'pending'),
+    ('event_stats', 'event_type', 'event_stat_type',
+     ['POWER', 'FURNACE', 'CONTRIBUTION', 'BEAR', 'CUSTOM'], None),
+]
+
+
+def upgrade():
+    # SQLite already keeps these as VARCHAR; only PostgreSQL has the separate
+    # enum type objects that need ALTER TYPE for every new member
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table_name, column, type_name, names, default in ENUM_COLUMNS:
+        if default is not None:
+            op.alter_column(table_name, column, server_default=None)
+        # The ORM reads and writes member names; upper() also repairs rows
+        # written with the lowercase labels from the initial schema
+        op.alter_column(
+            table_name,
+            column,
+            type_=sa.String(max(len(name) for name in names)),
+            postgresql_using=f'upper({column}::text)',
+        )
+        if default is not None:
+            op.alter_column(table_name, column, server_default=default.upper())
+        op.execute(f'DROP TYPE IF EXISTS {type_name}')
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table_name, column, type_name, names, default in ENUM_COLUMNS:
+        labels = ", ".join(f"'{name}'" for name in names)
+        op.execute(f'CREATE TYPE {type_name} AS ENUM ({labels})')
+        if default is not None:
+            op.alter_column(table_name, column, server_default=None)
+        op.alter_column(
+            table_name,
+            column,
+            type_=postgresql.ENUM(*names, name=type_name, create_type=False),
+            postgresql_using=f'{column}::{type_name}',
+        )
+        if default is not None:
+            op.alter_column(table_name, column, server_default=default.upper())
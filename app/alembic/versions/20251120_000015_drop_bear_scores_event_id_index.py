@@ -0,0 +1,26 @@
+"""Drop the single-column bear_scores.bear_event_id index
+
+Revision ID: 20251120_000015
+Revises: 20251120_000014
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20251120_000015'
+down_revision = '20251120_000014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # idx_bear_scores_event_player (bear_event_id, player_id), created in
+    # 20251119_000009, leads with bear_event_id and so already serves the FK
+    # lookups and the duplicate-key scans; the single-column index is redundant
+    op.execute("DROP INDEX IF EXISTS ix_bear_scores_bear_event_id")
+
+
+def downgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_bear_scores_bear_event_id ON bear_scores (bear_event_id)")
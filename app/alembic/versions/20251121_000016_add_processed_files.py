@@ -0,0 +1,35 @@
+"""Add processed_files table
+
+Revision ID: 20251121_000016
+Revises: 20251120_000015
+Create Date: 2025-11-21
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20251121_000016'
+down_revision = '20251120_000015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Checkpoints for the bulk upload scripts: a file whose contents were
+    # already processed is skipped by hash before any OCR request is made
+    op.create_table(
+        'processed_files',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('path', sa.String(length=512), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('result', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('sha256', name='uq_processed_files_sha256'),
+    )
+
+
+def downgrade():
+    op.drop_table('processed_files')
@@ -0,0 +1,49 @@
+"""Drop indexes made redundant by wider ones
+
+Revision ID: 20251121_000017
+Revises: 20251121_000016
+Create Date: 2025-11-21
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20251121_000017'
+down_revision = '20251121_000016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # idx_power_history_player_time / idx_furnace_history_player_time (from
+    # 20251119_000009) lead with player_id, so the single-column player_id
+    # indexes from the initial schema only cost writes. The captured_at-only
+    # indexes stay for cross-player time-range scans.
+    op.execute("DROP INDEX IF EXISTS ix_player_power_history_player_id")
+    op.execute("DROP INDEX IF EXISTS ix_player_furnace_history_player_id")
+
+    # (foundry_event_id, player_id) lookups are already served by the indexes
+    # behind uq_foundry_result_event_player / uq_foundry_signup_event_player
+    # (20251116_000004); 20251119_000009 created a second copy of each
+    op.execute("DROP INDEX IF EXISTS idx_foundry_results_event_player")
+    op.execute("DROP INDEX IF EXISTS idx_foundry_signups_event_player")
+
+
+def downgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_foundry_signups_event_player "
+        "ON foundry_signups (foundry_event_id, player_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_foundry_results_event_player "
+        "ON foundry_results (foundry_event_id, player_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_player_furnace_history_player_id "
+        "ON player_furnace_history (player_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_player_power_history_player_id "
+        "ON player_power_history (player_id)"
+    )
@@ -1,69 +1,120 @@
 #!/usr/bin/env python3
-"""Manually add a player to the database."""
+"""Manually add one or more players to the database."""
+import csv
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import pytz
-from datetime import datetime
-from sqlalchemy import create_engine, select
+from datetime import datetime, timezone
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from observatory.db import models
-from observatory.settings import settings
+from observatory.db.session import get_engine
+
+
+def _optional_int(value):
+    """Parse an optional integer column (blank means unknown)."""
+    value = (value or "").strip()
+    return int(value) if value else None
+
+
+def read_players_csv(source):
+    """Read players from a CSV with columns: name[,power[,furnace_level]]."""
+    handle = sys.stdin if source == "-" else open(source, newline="", encoding="utf-8")
+    try:
+        players = []
+        for row in csv.reader(handle):
+            if not row or not row[0].strip() or row[0].strip().lower() == "name":
+                continue  # Skip blank lines and an optional header row
+            players.append({
+                "name": row[0].strip(),
+                "power": _optional_int(row[1] if len(row) > 1 else None),
+                "furnace_level": _optional_int(row[2] if len(row) > 2 else None),
+            })
+        return players
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
 
 def main():
-    """Add a player to the database."""
-    if len(sys.argv) < 2:
+    """Add players to the database."""
+    if len(sys.argv) < 2 or (sys.argv[1] == "--csv" and len(sys.argv) < 3):
         print("Usage: python3 add_missing_player.py <player_name> [power] [furnace_level]")
+        print("       python3 add_missing_player.py --csv <file.csv|->")
         print("\nExamples:")
         print('  python3 add_missing_player.py "†-WRATH-†"')
         print('  python3 add_missing_player.py "xOsaツKȲA" 150000000 28')
+        print("  python3 add_missing_player.py --csv missing_players.csv  # name,power,furnace_level")
         sys.exit(1)
 
-    player_name = sys.argv[1]
-    power = int(sys.argv[2]) if len(sys.argv) > 2 else None
-    furnace_level = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    if sys.argv[1] == "--csv":
+        players = read_players_csv(sys.argv[2])
+    else:
+        players = [{
+            "name": sys.argv[1],
+            "power": int(sys.argv[2]) if len(sys.argv) > 2 else None,
+            "furnace_level": int(sys.argv[3]) if len(sys.argv) > 3 else None,
+        }]
 
-    engine = create_engine(settings.database_url)
+    engine = get_engine()
 
     with Session(engine) as session:
-        # Check if player already exists
+        # Check which players already exist (one query for the whole batch)
         existing = session.execute(
             select(models.Player).where(
                 models.Player.alliance_id == 1,
-                models.Player.name == player_name
+                models.Player.name.in_([p["name"] for p in players])
             )
-        ).scalar_one_or_none()
+        ).scalars().all()
+
+        for player in existing:
+            print(f"❌ Player '{player.name}' already exists (ID: {player.id})")
+            print(f"   Power: {player.current_power:,}" if player.current_power else "   Power: N/A")
+            print(f"   Furnace: FC{player.current_furnace}" if player.current_furnace else "   Furnace: N/A")
+
+        existing_names = {player.name for player in existing}
+        seen = set()
+        to_add = []
+        for player in players:
+            if player["name"] in existing_names or player["name"] in seen:
+                continue
+            seen.add(player["name"])
+            to_add.append(player)
 
-        if existing:
-            print(f"❌ Player '{player_name}' already exists (ID: {existing.id})")
-            print(f"   Power: {existing.current_power:,}" if existing.current_power else "   Power: N/A")
-            print(f"   Furnace: FC{existing.current_furnace}" if existing.current_furnace else "   Furnace: N/A")
+        if not to_add:
             return
 
-        # Create new player
-        now = datetime.now(pytz.UTC)
-        new_player = models.Player(
-            alliance_id=1,
-            name=player_name,
-            current_power=power,
-            current_furnace=furnace_level,
-            created_at=now,
-            updated_at=now
-        )
-
-        session.add(new_player)
+        # Create new players with a single multi-row INSERT
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "alliance_id": 1,
+                "name": player["name"],
+                "current_power": player["power"],
+                "current_furnace": player["furnace_level"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for player in to_add
+        ]
+        inserted = session.execute(
+            insert(models.Player).returning(models.Player.id, models.Player.name),
+            rows
+        ).all()
         session.commit()
 
-        print(f"✅ Successfully added player: {player_name} (ID: {new_player.id})")
-        if power:
-            print(f"   Power: {power:,}")
-        if furnace_level:
-            print(f"   Furnace: FC{furnace_level}")
+        new_ids = {name: player_id for player_id, name in inserted}
+        for player in to_add:
+            print(f"✅ Successfully added player: {player['name']} (ID: {new_ids.get(player['name'])})")
+            if player["power"]:
+                print(f"   Power: {player['power']:,}")
+            if player["furnace_level"]:
+                print(f"   Furnace: FC{player['furnace_level']}")
 
-        print("\nPlayer is now available for matching in future screenshot uploads.")
+        print("\nPlayers are now available for matching in future screenshot uploads.")
 
 if __name__ == "__main__":
     main()
@@ -6,20 +6,24 @@ This script checks for duplicate records across all tables and reports findings.
 Can be run manually or scheduled as a cron job.
 
 Usage:
-    python scripts/check_all_duplicates.py [--fix]
+    python scripts/check_all_duplicates.py [--fix] [--table NAME ...]
 
 Options:
-    --fix    Automatically fix duplicates (use with caution)
+    --fix           Delete duplicate rows, keeping one per key (use with caution)
+    --table NAME    Only check the named table (repeatable)
 """
+import json
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # Add parent directory to path to import observatory modules
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import text
-from observatory.db.session import SessionLocal
+from sqlalchemy import bindparam, text
+from observatory.db.session import SessionLocal, engine
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,187 +32,230 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def check_player_power_history_duplicates(session):
-    """Check for duplicate power history entries."""
-    logger.info("Checking player_power_history for duplicates...")
-
-    result = session.execute(text("""
-        SELECT player_id, captured_at, COUNT(*) as count
-        FROM player_power_history
-        GROUP BY player_id, captured_at
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate player power history entries:")
-        for row in result[:10]:  # Show first 10
-            logger.warning(f"  Player {row.player_id} at {row.captured_at}: {row.count} entries")
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in player_power_history")
-        return 0
-
-
-def check_player_furnace_history_duplicates(session):
-    """Check for duplicate furnace history entries."""
-    logger.info("Checking player_furnace_history for duplicates...")
-
-    result = session.execute(text("""
-        SELECT player_id, captured_at, COUNT(*) as count
-        FROM player_furnace_history
-        GROUP BY player_id, captured_at
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate furnace history entries:")
-        for row in result[:10]:
-            logger.warning(f"  Player {row.player_id} at {row.captured_at}: {row.count} entries")
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in player_furnace_history")
-        return 0
-
-
-def check_contribution_snapshots_duplicates(session):
-    """Check for duplicate contribution snapshots."""
-    logger.info("Checking contribution_snapshots for duplicates...")
-
-    result = session.execute(text("""
-        SELECT alliance_id, player_id, week_start_date, snapshot_date, COUNT(*) as count
-        FROM contribution_snapshots
-        GROUP BY alliance_id, player_id, week_start_date, snapshot_date
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate contribution snapshots:")
-        for row in result[:10]:
-            logger.warning(
-                f"  Alliance {row.alliance_id}, Player {row.player_id}, "
-                f"Week {row.week_start_date}, Snapshot {row.snapshot_date}: {row.count} entries"
+# (table, key columns, description, per-group message). Keys come back as
+# text columns k1..k4 so every table fits one UNION ALL result shape.
+DUPLICATE_CHECKS = [
+    ("player_power_history", ("player_id", "captured_at"),
+     "player power history entries", "Player {k1} at {k2}"),
+    ("player_furnace_history", ("player_id", "captured_at"),
+     "furnace history entries", "Player {k1} at {k2}"),
+    ("contribution_snapshots", ("alliance_id", "player_id", "week_start_date", "snapshot_date"),
+     "contribution snapshots", "Alliance {k1}, Player {k2}, Week {k3}, Snapshot {k4}"),
+    ("bear_scores", ("bear_event_id", "player_id"),
+     "bear scores", "Event {k1}, Player {k2}"),
+    ("ac_signups", ("ac_event_id", "player_id"),
+     "AC signups", "Event {k1}, Player {k2}"),
+    ("foundry_signups", ("foundry_event_id", "player_id"),
+     "foundry signups", "Event {k1}, Player {k2}"),
+    ("foundry_results", ("foundry_event_id", "player_id"),
+     "foundry results", "Event {k1}, Player {k2}"),
+]
+
+# Key columns are returned as k1..k<MAX_KEYS>
+MAX_KEYS = 4
+
+# Number of duplicate groups listed per table
+EXAMPLE_LIMIT = 10
+
+# Tables whose duplicate groups also carry their rows (ordered by the last
+# column) as a JSON sample, so the example details need no second query
+SAMPLE_COLUMNS = {
+    "bear_scores": ("id", "score", "rank", "recorded_at"),
+}
+
+# Which copy --fix keeps: by default the oldest (lowest id), like the dedup
+# migrations; ac_signups keeps the highest ac_power as migration 000006 does.
+# Each entry is the condition under which "better" outranks the table row.
+FIX_PREFERENCES = {
+    "ac_signups": (
+        "better.ac_power > ac_signups.ac_power "
+        "OR (better.ac_power = ac_signups.ac_power AND better.id < ac_signups.id)"
+    ),
+}
+
+# Ids per DELETE statement (stays under SQLite's bound-parameter limit)
+FIX_CHUNK_SIZE = 900
+
+
+def build_sample_expression(table, keys, dialect_name):
+    """Build a JSON array of one duplicate group's rows, or NULL."""
+    columns = SAMPLE_COLUMNS.get(table)
+    if columns is None:
+        return "NULL"
+    same_key = " AND ".join(f"dup.{key} = {table}.{key}" for key in keys)
+    fields = ", ".join(f"'{column}', dup.{column}" for column in columns)
+    if dialect_name == "postgresql":
+        return (
+            f"(SELECT CAST(json_agg(json_build_object({fields}) ORDER BY dup.{columns[-1]}) AS TEXT) "
+            f"FROM {table} AS dup WHERE {same_key})"
+        )
+    # SQLite aggregates in the order the ordered subquery yields rows
+    return (
+        f"(SELECT json_group_array(json_object({fields.replace('dup.', '')})) "
+        f"FROM (SELECT * FROM {table} AS dup WHERE {same_key} ORDER BY dup.{columns[-1]}))"
+    )
+
+
+def build_table_query(table, keys, dialect_name):
+    """Build the duplicate probe for one table in the shared result shape."""
+    columns = [f"CAST({key} AS TEXT)" for key in keys]
+    columns += ["NULL"] * (MAX_KEYS - len(keys))
+    key_list = ", ".join(
+        f"{column} AS k{i}" for i, column in enumerate(columns, 1)
+    )
+    # Only rows with an older twin are grouped: the EXISTS probe is an
+    # index lookup on the key columns, so clean tables aggregate nothing.
+    # Each group then holds every copy except the oldest, hence the + 1.
+    same_key = " AND ".join(f"older.{key} = {table}.{key}" for key in keys)
+    # Only EXAMPLE_LIMIT groups per table come back; COUNT(*) OVER ()
+    # carries the total number of duplicate groups on each of them
+    return (
+        f"SELECT * FROM ("
+        f"SELECT '{table}' AS tbl, {key_list}, COUNT(*) + 1 AS count, "
+        f"COUNT(*) OVER () AS total, "
+        f"{build_sample_expression(table, keys, dialect_name)} AS sample "
+        f"FROM {table} WHERE EXISTS ("
+        f"SELECT 1 FROM {table} AS older WHERE {same_key} AND older.id < {table}.id"
+        f") GROUP BY {', '.join(keys)} LIMIT {EXAMPLE_LIMIT}"
+        f") AS {table}_duplicates"
+    )
+
+
+def build_duplicate_query(checks, dialect_name):
+    """Build one UNION ALL statement covering every given table's probe."""
+    return "\nUNION ALL\n".join(
+        build_table_query(table, keys, dialect_name) for table, keys, _, _ in checks
+    )
+
+
+# The statements are built once per process and the same TextClause is
+# reused, so later runs (--fix re-scan, imports from a long-lived process)
+# skip rebuilding and re-parsing the SQL and hit the engine's compiled cache
+@lru_cache(maxsize=None)
+def table_statement(table, keys, dialect_name):
+    """Return the cached duplicate probe statement for one table."""
+    return text(build_table_query(table, keys, dialect_name))
+
+
+@lru_cache(maxsize=None)
+def duplicate_statement(checks, dialect_name):
+    """Return the cached UNION ALL probe statement for a tuple of checks."""
+    return text(build_duplicate_query(checks, dialect_name))
+
+
+def fetch_table_groups(table, keys, dialect_name):
+    """Run one table's duplicate probe on its own session."""
+    with SessionLocal() as session:
+        return session.execute(table_statement(table, keys, dialect_name)).all()
+
+
+def find_duplicate_groups(session, checks):
+    """Fetch the duplicate groups of the given tables."""
+    dialect_name = session.get_bind().dialect.name
+
+    if dialect_name == "sqlite":
+        # In-process SQLite has no round-trips to save, but the driver
+        # releases the GIL while a query runs, so probing each table on its
+        # own connection spreads the scans across cores
+        with ThreadPoolExecutor(max_workers=len(checks) or 1) as pool:
+            results = pool.map(
+                lambda check: fetch_table_groups(check[0], check[1], dialect_name), checks
             )
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in contribution_snapshots")
-        return 0
+            return {check[0]: rows for check, rows in zip(checks, results)}
 
+    # Database servers: one UNION ALL statement, so one round-trip
+    groups = {table: [] for table, _, _, _ in checks}
+    for row in session.execute(duplicate_statement(tuple(checks), dialect_name)):
+        groups[row.tbl].append(row)
+    return groups
 
-def check_bear_scores_duplicates(session):
-    """Check for duplicate bear scores."""
-    logger.info("Checking bear_scores for duplicates...")
-
-    result = session.execute(text("""
-        SELECT bear_event_id, player_id, COUNT(*) as count
-        FROM bear_scores
-        GROUP BY bear_event_id, player_id
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate bear scores:")
-        for row in result[:10]:
-            logger.warning(f"  Event {row.bear_event_id}, Player {row.player_id}: {row.count} entries")
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-
-        # Show details of first duplicate
-        if result:
-            first = result[0]
-            details = session.execute(text("""
-                SELECT id, score, rank, recorded_at
-                FROM bear_scores
-                WHERE bear_event_id = :event_id AND player_id = :player_id
-                ORDER BY recorded_at
-            """), {"event_id": first.bear_event_id, "player_id": first.player_id}).fetchall()
-
-            logger.warning(f"  Example duplicate details (Event {first.bear_event_id}, Player {first.player_id}):")
-            for detail in details:
-                logger.warning(f"    ID {detail.id}: score={detail.score}, rank={detail.rank}, recorded={detail.recorded_at}")
-
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in bear_scores")
-        return 0
 
+def report_duplicates(table, description, message, result):
+    """Log the duplicate groups found for one table."""
+    logger.info(f"Checking {table} for duplicates...")
 
-def check_ac_signups_duplicates(session):
-    """Check for duplicate AC signups."""
-    logger.info("Checking ac_signups for duplicates...")
-
-    result = session.execute(text("""
-        SELECT ac_event_id, player_id, COUNT(*) as count
-        FROM ac_signups
-        GROUP BY ac_event_id, player_id
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate AC signups:")
-        for row in result[:10]:
-            logger.warning(f"  Event {row.ac_event_id}, Player {row.player_id}: {row.count} entries")
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in ac_signups")
-        return 0
-
-
-def check_foundry_signups_duplicates(session):
-    """Check for duplicate foundry signups."""
-    logger.info("Checking foundry_signups for duplicates...")
-
-    result = session.execute(text("""
-        SELECT foundry_event_id, player_id, COUNT(*) as count
-        FROM foundry_signups
-        GROUP BY foundry_event_id, player_id
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate foundry signups:")
-        for row in result[:10]:
-            logger.warning(f"  Event {row.foundry_event_id}, Player {row.player_id}: {row.count} entries")
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in foundry_signups")
-        return 0
-
-
-def check_foundry_results_duplicates(session):
-    """Check for duplicate foundry results."""
-    logger.info("Checking foundry_results for duplicates...")
-
-    result = session.execute(text("""
-        SELECT foundry_event_id, player_id, COUNT(*) as count
-        FROM foundry_results
-        GROUP BY foundry_event_id, player_id
-        HAVING COUNT(*) > 1
-    """)).fetchall()
-
-    if result:
-        logger.warning(f"Found {len(result)} duplicate foundry results:")
-        for row in result[:10]:
-            logger.warning(f"  Event {row.foundry_event_id}, Player {row.player_id}: {row.count} entries")
-        if len(result) > 10:
-            logger.warning(f"  ... and {len(result) - 10} more")
-        return len(result)
-    else:
-        logger.info("✓ No duplicates found in foundry_results")
+    if not result:
+        logger.info(f"✓ No duplicates found in {table}")
         return 0
 
+    total = result[0].total
+    logger.warning(f"Found {total} duplicate {description}:")
+    for row in result:
+        logger.warning(f"  {message.format(k1=row.k1, k2=row.k2, k3=row.k3, k4=row.k4)}: {row.count} entries")
+    if total > len(result):
+        logger.warning(f"  ... and {total - len(result)} more")
+
+    first = result[0]
+    if first.sample is not None:
+        # Show details of first duplicate (fetched inline with the groups)
+        logger.warning(f"  Example duplicate details (Event {first.k1}, Player {first.k2}):")
+        for detail in json.loads(first.sample):
+            logger.warning(
+                f"    ID {detail['id']}: score={detail['score']}, rank={detail['rank']}, "
+                f"recorded={detail['recorded_at']}"
+            )
 
-def check_all_duplicates():
-    """Run all duplicate checks."""
+    return total
+
+
+def fix_duplicates(session, table, keys):
+    """Delete every copy but the preferred one of each duplicate key."""
+    same_key = " AND ".join(f"better.{key} = {table}.{key}" for key in keys)
+    preference = FIX_PREFERENCES.get(table, f"better.id < {table}.id")
+    ids_to_drop = session.execute(text(f"""
+        SELECT id FROM {table}
+        WHERE EXISTS (
+            SELECT 1 FROM {table} AS better
+            WHERE {same_key} AND ({preference})
+        )
+    """)).scalars().all()
+
+    # A handful of statements per table rather than one DELETE per row
+    delete = text(f"DELETE FROM {table} WHERE id IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    for start in range(0, len(ids_to_drop), FIX_CHUNK_SIZE):
+        session.execute(delete, {"ids": ids_to_drop[start:start + FIX_CHUNK_SIZE]})
+
+    return len(ids_to_drop)
+
+
+def fix_all_duplicates(tables=None):
+    """Remove duplicates from the given tables (default: all) in one transaction."""
+    total_deleted = 0
+
+    # One connection for the whole run, so the synchronous setting changed
+    # below is the one the DELETEs run on and the one that gets restored
+    with engine.connect() as connection:
+        sqlite = connection.dialect.name == "sqlite"
+        if sqlite:
+            # One commit for every table, and NORMAL sync while the large
+            # DELETEs run; set before the first write opens the transaction
+            synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+            connection.exec_driver_sql("PRAGMA synchronous=NORMAL")
+            connection.commit()
+
+        try:
+            with SessionLocal(bind=connection) as session:
+                for table, keys, description, _ in DUPLICATE_CHECKS:
+                    if tables is not None and table not in tables:
+                        continue
+                    deleted = fix_duplicates(session, table, keys)
+                    if deleted:
+                        logger.warning(f"Deleted {deleted} duplicate {description}")
+                    total_deleted += deleted
+                session.commit()
+        finally:
+            if sqlite:
+                connection.rollback()
+                connection.exec_driver_sql(f"PRAGMA synchronous={int(synchronous)}")
+                connection.commit()
+
+    return total_deleted
+
+
+def check_all_duplicates(tables=None):
+    """Run the duplicate checks for the given tables (default: all)."""
     logger.info("=" * 60)
     logger.info("Starting comprehensive duplicate detection scan")
     logger.info("=" * 60)
@@ -217,14 +264,12 @@ def check_all_duplicates():
     total_issues = 0
 
     try:
-        # Check each table
-        total_issues += check_player_power_history_duplicates(session)
-        total_issues += check_player_furnace_history_duplicates(session)
-        total_issues += check_contribution_snapshots_duplicates(session)
-        total_issues += check_bear_scores_duplicates(session)
-        total_issues += check_ac_signups_duplicates(session)
-        total_issues += check_foundry_signups_duplicates(session)
-        total_issues += check_foundry_results_duplicates(session)
+        checks = [check for check in DUPLICATE_CHECKS if tables is None or check[0] in tables]
+
+        # All tables are probed by one statement; report them in turn
+        groups = find_duplicate_groups(session, checks)
+        for table, _, description, message in checks:
+            total_issues += report_duplicates(table, description, message, groups[table])
 
         logger.info("=" * 60)
         if total_issues == 0:
@@ -245,14 +290,21 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Check for duplicate records in the database")
-    parser.add_argument("--fix", action="store_true", help="Automatically fix duplicates (not implemented yet)")
+    parser.add_argument("--fix", action="store_true", help="Delete duplicate rows, keeping one per key")
+    parser.add_argument(
+        "--table",
+        action="append",
+        choices=[table for table, _, _, _ in DUPLICATE_CHECKS],
+        help="Only check this table (can be given more than once)",
+    )
     args = parser.parse_args()
 
-    if args.fix:
-        logger.error("Automatic fixing not implemented yet. Please run migrations instead.")
-        sys.exit(1)
+    total_issues = check_all_duplicates(args.table)
+
+    if args.fix and total_issues:
+        fix_all_duplicates(args.table)
+        total_issues = check_all_duplicates(args.table)
 
-    total_issues = check_all_duplicates()
     sys.exit(0 if total_issues == 0 else 1)
 
 
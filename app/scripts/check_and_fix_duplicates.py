@@ -6,14 +6,12 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import engine
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
-
-    with engine.begin() as conn:
+    # Read-only steps use a plain connection; only the fix takes a write lock
+    with engine.connect() as conn:
         print("=" * 60)
         print("STEP 1: Checking for duplicates...")
         print("=" * 60)
@@ -24,7 +22,8 @@ def main():
                 player_id,
                 week_start_date,
                 snapshot_date,
-                COUNT(*) as duplicate_count
+                COUNT(*) as duplicate_count,
+                COUNT(*) OVER () as total_sets
             FROM contribution_snapshots
             GROUP BY alliance_id, player_id, week_start_date, snapshot_date
             HAVING COUNT(*) > 1
@@ -37,18 +36,24 @@ def main():
         if not duplicates:
             print("✓ No duplicates found!")
         else:
-            print(f"✗ Found {len(duplicates)} sets of duplicates:")
+            print(f"✗ Found {duplicates[0].total_sets} sets of duplicates (showing up to 20):")
             for row in duplicates:
                 print(f"  Alliance {row[0]}, Player {row[1]}, Week {row[2]}, Snapshot {row[3]}: {row[4]} copies")
 
+    with engine.begin() as conn:
         print("\n" + "=" * 60)
         print("STEP 2: Normalizing dates to midnight UTC...")
         print("=" * 60)
 
+        # Midnight UTC in the same fixed-width text TZDateTime writes; only
+        # rows that are not already normalized are rewritten, and values
+        # SQLite can't parse are kept as they are
         result = conn.execute(text("""
             UPDATE contribution_snapshots
-            SET snapshot_date = datetime(date(snapshot_date)),
-                week_start_date = datetime(date(week_start_date))
+            SET snapshot_date = COALESCE(strftime('%Y-%m-%dT00:00:00.000000Z', snapshot_date), snapshot_date),
+                week_start_date = COALESCE(strftime('%Y-%m-%dT00:00:00.000000Z', week_start_date), week_start_date)
+            WHERE snapshot_date <> strftime('%Y-%m-%dT00:00:00.000000Z', snapshot_date)
+               OR week_start_date <> strftime('%Y-%m-%dT00:00:00.000000Z', week_start_date)
         """))
 
         print(f"✓ Normalized {result.rowcount} rows")
@@ -57,17 +62,41 @@ def main():
         print("STEP 3: Removing duplicates (keeping earliest)...")
         print("=" * 60)
 
+        # Collect only the duplicated keys (with the id to keep) first, then
+        # delete the other copies key by key; clean tables stop after the
+        # grouping pass and the working set is bounded by the duplicate keys
+        conn.execute(text("""
+            CREATE TEMP TABLE contribution_dedup_keep AS
+            SELECT
+                alliance_id,
+                player_id,
+                week_start_date,
+                snapshot_date,
+                MIN(id) as keep_id
+            FROM contribution_snapshots
+            GROUP BY alliance_id, player_id, week_start_date, snapshot_date
+            HAVING COUNT(*) > 1
+        """))
+
         result = conn.execute(text("""
             DELETE FROM contribution_snapshots
-            WHERE id NOT IN (
-                SELECT MIN(id)
-                FROM contribution_snapshots
-                GROUP BY alliance_id, player_id, week_start_date, snapshot_date
+            WHERE id IN (
+                SELECT cs.id
+                FROM contribution_dedup_keep k
+                JOIN contribution_snapshots cs
+                    ON cs.alliance_id = k.alliance_id
+                    AND cs.player_id = k.player_id
+                    AND cs.week_start_date = k.week_start_date
+                    AND cs.snapshot_date = k.snapshot_date
+                    AND cs.id <> k.keep_id
             )
         """))
 
         print(f"✓ Deleted {result.rowcount} duplicate rows")
 
+        conn.execute(text("DROP TABLE contribution_dedup_keep"))
+
+    with engine.connect() as conn:
         print("\n" + "=" * 60)
         print("STEP 4: Verifying fix...")
         print("=" * 60)
@@ -6,13 +6,10 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import engine
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
-
     with engine.begin() as conn:
         print("=" * 60)
         print("Checking for duplicate bear events...")
@@ -24,7 +21,8 @@ def main():
                 alliance_id,
                 trap_id,
                 started_at,
-                COUNT(*) as event_count
+                COUNT(*) as event_count,
+                COUNT(*) OVER () as total_sets
             FROM bear_events
             GROUP BY alliance_id, trap_id, started_at
             HAVING COUNT(*) > 1
@@ -37,7 +35,7 @@ def main():
         if not duplicates:
             print("✓ No duplicate bear events found!")
         else:
-            print(f"✗ Found {len(duplicates)} sets of duplicate bear events:\n")
+            print(f"✗ Found {duplicates[0].total_sets} sets of duplicate bear events (showing up to 20):\n")
             for row in duplicates:
                 print(f"  Alliance {row[0]}, Trap {row[1]}, Started {row[2]}: {row[3]} duplicate events")
 
@@ -45,17 +43,30 @@ def main():
         print("All bear events (most recent 20):")
         print("=" * 60)
 
+        # Pick the 20 events first, then count their scores in one grouped
+        # pass (uses the bear_event_id index) instead of a COUNT per event
         result = conn.execute(text("""
+            WITH recent AS (
+                SELECT id, alliance_id, trap_id, started_at, ended_at
+                FROM bear_events
+                ORDER BY started_at DESC
+                LIMIT 20
+            )
             SELECT
-                id,
-                alliance_id,
-                trap_id,
-                started_at,
-                ended_at,
-                (SELECT COUNT(*) FROM bear_scores WHERE bear_event_id = bear_events.id) as score_count
-            FROM bear_events
-            ORDER BY started_at DESC
-            LIMIT 20
+                recent.id,
+                recent.alliance_id,
+                recent.trap_id,
+                recent.started_at,
+                recent.ended_at,
+                COALESCE(scores.score_count, 0) as score_count
+            FROM recent
+            LEFT JOIN (
+                SELECT bear_event_id, COUNT(*) as score_count
+                FROM bear_scores
+                WHERE bear_event_id IN (SELECT id FROM recent)
+                GROUP BY bear_event_id
+            ) scores ON scores.bear_event_id = recent.id
+            ORDER BY recent.started_at DESC
         """))
 
         events = result.fetchall()
@@ -6,18 +6,36 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import engine
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
-
     with engine.connect() as conn:
         print("=" * 60)
         print("Checking bear event timestamps for timezone info...")
         print("=" * 60)
 
+        # One aggregate over all events; rows are only fetched when some
+        # timestamps turn out to be missing timezone info
+        summary = conn.execute(text("""
+            SELECT
+                COUNT(*) as total,
+                COALESCE(SUM(CASE WHEN started_at LIKE '%+%' OR started_at LIKE '%Z' THEN 1 ELSE 0 END), 0) as aware
+            FROM bear_events
+        """)).one()
+
+        if not summary.total:
+            print("No bear events found")
+            return
+
+        naive = summary.total - summary.aware
+        print(f"\nTotal bear events: {summary.total}")
+        print(f"  ✓ With timezone info: {summary.aware}")
+        print(f"  ✗ Missing timezone info (naive datetime): {naive}")
+
+        if not naive:
+            return
+
         result = conn.execute(text("""
             SELECT
                 id,
@@ -25,26 +43,16 @@ def main():
                 started_at,
                 typeof(started_at) as type
             FROM bear_events
+            WHERE NOT (started_at LIKE '%+%' OR started_at LIKE '%Z')
             ORDER BY id DESC
-            LIMIT 10
+            LIMIT 5
         """))
 
-        events = result.fetchall()
-
-        if not events:
-            print("No bear events found")
-            return
-
-        for event in events:
+        print("\nExamples of naive timestamps:")
+        for event in result:
             print(f"\nEvent ID {event[0]}, Trap {event[1]}:")
             print(f"  started_at: {event[2]}")
             print(f"  SQLite type: {event[3]}")
 
-            # Check if it contains timezone info
-            if '+' in str(event[2]) or 'Z' in str(event[2]):
-                print(f"  ✓ Has timezone info")
-            else:
-                print(f"  ✗ Missing timezone info (naive datetime)")
-
 if __name__ == "__main__":
     main()
@@ -7,13 +7,10 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import engine
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
-
     with engine.connect() as conn:
         print("=" * 80)
         print("ALEMBIC MIGRATION VERSION")
@@ -32,7 +29,7 @@ def main():
         print("DUPLICATE FOUNDRY SIGNUPS")
         print("=" * 80)
         result = conn.execute(text("""
-            SELECT foundry_event_id, player_id, COUNT(*) as count
+            SELECT foundry_event_id, player_id, COUNT(*) as count, COUNT(*) OVER () as total
             FROM foundry_signups
             GROUP BY foundry_event_id, player_id
             HAVING COUNT(*) > 1
@@ -42,7 +39,7 @@ def main():
 
         rows = list(result)
         if rows:
-            print(f"Found {len(rows)} duplicate signup combinations:")
+            print(f"Found {rows[0].total} duplicate signup combinations (showing up to 20):")
             for row in rows:
                 print(f"  Event {row[0]}, Player {row[1]}: {row[2]} duplicates")
         else:
@@ -53,7 +50,7 @@ def main():
         print("DUPLICATE FOUNDRY RESULTS")
         print("=" * 80)
         result = conn.execute(text("""
-            SELECT foundry_event_id, player_id, COUNT(*) as count
+            SELECT foundry_event_id, player_id, COUNT(*) as count, COUNT(*) OVER () as total
             FROM foundry_results
             GROUP BY foundry_event_id, player_id
             HAVING COUNT(*) > 1
@@ -63,7 +60,7 @@ def main():
 
         rows = list(result)
         if rows:
-            print(f"Found {len(rows)} duplicate result combinations:")
+            print(f"Found {rows[0].total} duplicate result combinations (showing up to 20):")
             for row in rows:
                 print(f"  Event {row[0]}, Player {row[1]}: {row[2]} duplicates")
         else:
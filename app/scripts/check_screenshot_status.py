@@ -7,31 +7,59 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import engine
+
+# Status counts plus the pending and failed listings, tagged by section, so
+# the whole report comes back from one statement. Both listings filter on a
+# single status, which ix_screenshots_status_active covers.
+STATUS_REPORT_SQL = text("""
+    SELECT 'count' AS section, NULL AS id, status, COUNT(*) AS count,
+           NULL AS detected_type, NULL AS uploader, NULL AS source_path,
+           NULL AS error_message, NULL AS created_at
+    FROM screenshots
+    GROUP BY status
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'pending', id, status, NULL, detected_type, uploader, source_path,
+               NULL, created_at
+        FROM screenshots
+        WHERE status = 'PENDING'
+        ORDER BY created_at
+        LIMIT 20
+    ) AS pending
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'failed', id, status, NULL, detected_type, NULL, NULL,
+               error_message, created_at
+        FROM screenshots
+        WHERE status = 'FAILED'
+        ORDER BY created_at DESC
+        LIMIT 10
+    ) AS failed
+""")
 
-def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
 
+def main():
     with engine.connect() as conn:
+        sections = {"count": [], "pending": [], "failed": []}
+        for row in conn.execute(STATUS_REPORT_SQL):
+            sections[row.section].append(row)
+
+        # UNION ALL does not promise to keep each branch's order
+        sections["count"].sort(key=lambda row: row.status)
+        sections["pending"].sort(key=lambda row: row.created_at)
+        sections["failed"].sort(key=lambda row: row.created_at, reverse=True)
+
         print("=" * 80)
         print("SCREENSHOT STATUS SUMMARY")
         print("=" * 80)
 
-        # Get count by status
-        result = conn.execute(text("""
-            SELECT status, COUNT(*) as count
-            FROM screenshots
-            GROUP BY status
-            ORDER BY status
-        """))
-
-        rows = list(result)
+        rows = sections["count"]
         if rows:
             print("\nScreenshot counts by status:")
             for row in rows:
-                print(f"  {row[0]}: {row[1]}")
+                print(f"  {row.status}: {row.count}")
         else:
             print("No screenshots found in database")
 
@@ -40,19 +68,11 @@ def main():
         print("PENDING SCREENSHOTS (if any)")
         print("=" * 80)
 
-        result = conn.execute(text("""
-            SELECT id, detected_type, uploader, source_path, created_at
-            FROM screenshots
-            WHERE status = 'PENDING'
-            ORDER BY created_at
-            LIMIT 20
-        """))
-
-        rows = list(result)
+        rows = sections["pending"]
         if rows:
             print(f"\nFound {len(rows)} pending screenshots (showing first 20):")
             for row in rows:
-                print(f"  ID {row[0]}: {row[1]} - {row[2]} - {row[3]} ({row[4]})")
+                print(f"  ID {row.id}: {row.detected_type} - {row.uploader} - {row.source_path} ({row.created_at})")
         else:
             print("\n✓ No pending screenshots!")
 
@@ -61,21 +81,13 @@ def main():
         print("FAILED SCREENSHOTS (if any)")
         print("=" * 80)
 
-        result = conn.execute(text("""
-            SELECT id, detected_type, error_message, created_at
-            FROM screenshots
-            WHERE status = 'FAILED'
-            ORDER BY created_at DESC
-            LIMIT 10
-        """))
-
-        rows = list(result)
+        rows = sections["failed"]
         if rows:
             print(f"\nFound {len(rows)} failed screenshots (showing last 10):")
             for row in rows:
-                print(f"  ID {row[0]}: {row[1]}")
-                print(f"    Error: {row[2]}")
-                print(f"    Date: {row[3]}")
+                print(f"  ID {row.id}: {row.detected_type}")
+                print(f"    Error: {row.error_message}")
+                print(f"    Date: {row.created_at}")
                 print()
         else:
             print("\n✓ No failed screenshots!")
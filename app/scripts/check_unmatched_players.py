@@ -6,42 +6,51 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, select, text
+from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
 from observatory.db import models
-from observatory.settings import settings
+from observatory.db.player_matching import match_player_name
+from observatory.db.session import engine
 
 def main():
     """Find unmatched players and suggest solutions."""
-    engine = create_engine(settings.database_url)
-
     print("=" * 80)
     print("UNMATCHED PLAYERS DIAGNOSTIC TOOL")
     print("=" * 80)
 
     with Session(engine) as session:
         # Get alliance info
-        alliance = session.execute(
-            select(models.Alliance).where(models.Alliance.id == 1)
-        ).scalar_one_or_none()
+        alliance_name = session.scalar(
+            select(models.Alliance.name).where(models.Alliance.id == 1)
+        )
 
-        if not alliance:
+        if alliance_name is None:
             print("ERROR: No alliance found with ID 1")
             return
 
-        print(f"\nAlliance: {alliance.name} (ID: {alliance.id})")
+        print(f"\nAlliance: {alliance_name} (ID: 1)")
 
         # Count existing players
-        player_count = session.execute(
-            select(models.Player)
+        player_count = session.scalar(
+            select(func.count())
+            .select_from(models.Player)
             .where(models.Player.alliance_id == 1)
-        ).scalars().all()
+        )
+
+        print(f"Total players in database: {player_count}")
 
-        print(f"Total players in database: {len(player_count)}")
+        # Show all current players (sorted by the database, streamed as read)
+        players = session.execute(
+            select(models.Player)
+            .where(models.Player.alliance_id == 1)
+            .order_by(models.Player.name)
+        ).scalars()
 
-        # Show all current players
+        # Keep the listed players for the name checks below
+        alliance_players = []
         print(f"\n{'Current Players in Database:':-^80}")
-        for i, player in enumerate(sorted(player_count, key=lambda p: p.name), 1):
+        for i, player in enumerate(players, 1):
+            alliance_players.append(player)
             power_str = f"{player.current_power:,}" if player.current_power else "N/A"
             furnace_str = f"FC{player.current_furnace}" if player.current_furnace else "N/A"
             print(f"{i:3d}. {player.name:30s} | Power: {power_str:>15s} | {furnace_str}")
@@ -53,25 +62,20 @@ def main():
             "xOsaツKȲA"
         ]
 
+        players_by_name = {player.name: player for player in alliance_players}
         for unmatched in unmatched_names:
             print(f"\nLooking for matches to: '{unmatched}'")
 
             # Try exact match
-            exact_match = session.execute(
-                select(models.Player).where(
-                    models.Player.alliance_id == 1,
-                    models.Player.name == unmatched
-                )
-            ).scalar_one_or_none()
+            exact_match = players_by_name.get(unmatched)
 
             if exact_match:
                 print(f"  ✓ FOUND exact match: {exact_match.name} (ID: {exact_match.id})")
             else:
                 print(f"  ✗ NOT FOUND in database")
 
-                # Try fuzzy matching
-                from observatory.db.player_matching import fuzzy_match_player
-                fuzzy_player, similarity = fuzzy_match_player(session, 1, unmatched, threshold=0.70)
+                # Try fuzzy matching against the players loaded above
+                fuzzy_player, similarity = match_player_name(unmatched, alliance_players, threshold=0.70)
 
                 if fuzzy_player:
                     print(f"  ~ Fuzzy match: '{fuzzy_player.name}' (similarity: {similarity:.2%})")
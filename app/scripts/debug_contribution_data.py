@@ -7,12 +7,12 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import get_engine
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
+    """Print the contribution snapshot report."""
+    engine = get_engine()
 
     with engine.connect() as conn:
         print("=" * 80)
@@ -56,34 +56,40 @@ def main():
             GROUP BY a.id, a.name
         """))
 
-        for row in result:
-            print(f"\nAlliance: {row[0]} (ID: {row[1]})")
-            print(f"  Total snapshots: {row[2]}")
+        for row in result.mappings():
+            print(f"\nAlliance: {row['alliance_name']} (ID: {row['alliance_id']})")
+            print(f"  Total snapshots: {row['snapshot_count']}")
 
         # Check by week
         print("\n" + "=" * 80)
         print("SNAPSHOTS BY WEEK")
         print("=" * 80)
+        # Group by (week, snapshot date) first, then roll up per week: the
+        # distinct count becomes a plain COUNT(*) over the inner groups
         result = conn.execute(text("""
             SELECT
                 week_start_date,
-                COUNT(DISTINCT snapshot_date) as num_snapshots,
-                COUNT(*) as total_records,
+                COUNT(*) as num_snapshots,
+                SUM(num_records) as total_records,
                 MIN(snapshot_date) as first_snapshot,
                 MAX(snapshot_date) as last_snapshot
-            FROM contribution_snapshots
+            FROM (
+                SELECT week_start_date, snapshot_date, COUNT(*) as num_records
+                FROM contribution_snapshots
+                GROUP BY week_start_date, snapshot_date
+            ) per_snapshot
             GROUP BY week_start_date
             ORDER BY week_start_date DESC
         """))
 
-        rows = list(result)
+        rows = result.mappings().all()
         if rows:
             for row in rows:
-                print(f"\nWeek starting {row[0]}:")
-                print(f"  Snapshot dates: {row[1]}")
-                print(f"  Total records: {row[2]}")
-                print(f"  First snapshot: {row[3]}")
-                print(f"  Last snapshot: {row[4]}")
+                print(f"\nWeek starting {row['week_start_date']}:")
+                print(f"  Snapshot dates: {row['num_snapshots']}")
+                print(f"  Total records: {row['total_records']}")
+                print(f"  First snapshot: {row['first_snapshot']}")
+                print(f"  Last snapshot: {row['last_snapshot']}")
         else:
             print("\nNo data grouped by weeks")
 
@@ -94,39 +100,58 @@ def main():
         result = conn.execute(text("""
             SELECT
                 snapshot_date,
-                COUNT(DISTINCT player_id) as num_players,
-                COUNT(*) as num_records
-            FROM contribution_snapshots
+                COUNT(*) as num_players,
+                SUM(num_records) as num_records
+            FROM (
+                SELECT snapshot_date, player_id, COUNT(*) as num_records
+                FROM contribution_snapshots
+                GROUP BY snapshot_date, player_id
+            ) per_player
             GROUP BY snapshot_date
             ORDER BY snapshot_date DESC
             LIMIT 10
         """))
 
-        for row in result:
-            print(f"  {row[0]}: {row[1]} players ({row[2]} records)")
+        for row in result.mappings():
+            print(f"  {row['snapshot_date']}: {row['num_players']} players ({row['num_records']} records)")
 
         # Check for duplicates that might still exist
         print("\n" + "=" * 80)
         print("CHECKING FOR DUPLICATES")
         print("=" * 80)
+        # Only rows with an older copy are grouped; each EXISTS probe is a
+        # seek on the uq_contribution_snapshot index, so a clean table
+        # aggregates nothing instead of grouping every row (+ 1 counts the
+        # oldest copy)
         result = conn.execute(text("""
             SELECT
                 alliance_id,
                 player_id,
                 week_start_date,
                 snapshot_date,
-                COUNT(*) as count
-            FROM contribution_snapshots
+                COUNT(*) + 1 as count
+            FROM contribution_snapshots cs
+            WHERE EXISTS (
+                SELECT 1
+                FROM contribution_snapshots older
+                WHERE older.alliance_id = cs.alliance_id
+                  AND older.player_id = cs.player_id
+                  AND older.week_start_date = cs.week_start_date
+                  AND older.snapshot_date = cs.snapshot_date
+                  AND older.id < cs.id
+            )
             GROUP BY alliance_id, player_id, week_start_date, snapshot_date
-            HAVING COUNT(*) > 1
             LIMIT 10
         """))
 
-        dup_rows = list(result)
+        dup_rows = result.mappings().all()
         if dup_rows:
             print(f"\n⚠️  Found {len(dup_rows)} duplicate combinations:")
             for row in dup_rows:
-                print(f"  Alliance {row[0]}, Player {row[1]}, Week {row[2]}, Snapshot {row[3]}: {row[4]} records")
+                print(
+                    f"  Alliance {row['alliance_id']}, Player {row['player_id']}, "
+                    f"Week {row['week_start_date']}, Snapshot {row['snapshot_date']}: {row['count']} records"
+                )
         else:
             print("\n✓ No duplicates found!")
 
@@ -149,14 +174,14 @@ def main():
             LIMIT 5
         """))
 
-        for row in result:
-            print(f"\nID: {row[0]}")
-            print(f"  Player: {row[1]}")
-            print(f"  Contribution: {row[2]}")
-            print(f"  Rank: {row[3]}")
-            print(f"  Week start: {row[4]}")
-            print(f"  Snapshot date: {row[5]}")
-            print(f"  Created: {row[6]}")
+        for row in result.mappings():
+            print(f"\nID: {row['id']}")
+            print(f"  Player: {row['player_name']}")
+            print(f"  Contribution: {row['contribution_amount']}")
+            print(f"  Rank: {row['rank']}")
+            print(f"  Week start: {row['week_start_date']}")
+            print(f"  Snapshot date: {row['snapshot_date']}")
+            print(f"  Created: {row['created_at']}")
 
 
 if __name__ == "__main__":
@@ -13,15 +13,19 @@ Options:
     --dry-run         Show what would be deleted without actually deleting
     --include-failed  Also delete old failed screenshots
 """
+import os
 import sys
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from sqlalchemy import text
+from observatory.db.session import engine
 from observatory.settings import settings
 
 logging.basicConfig(
@@ -30,11 +34,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# File name suffixes treated as screenshots (matched case-insensitively)
+SCREENSHOT_EXTENSIONS = (".jpg", ".jpeg", ".png")
 
-def get_old_screenshots(upload_dir: Path, retention_days: int, include_failed: bool = False) -> tuple[list[Path], list[Path]]:
+# Concurrent unlinks; file deletes release the GIL, so threads keep the
+# storage (often a network mount for /app/uploads) busy
+DELETE_WORKERS = 16
+
+
+def load_failed_names() -> frozenset[str]:
+    """
+    Return the file names of screenshots recorded as FAILED in the database.
+
+    Loaded once so classifying each file is a set lookup; the lookup is served
+    by the partial index ix_screenshots_status_active.
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT source_path
+            FROM screenshots
+            WHERE status = 'FAILED'
+              AND source_path IS NOT NULL
+        """))
+        return frozenset(Path(source_path).name for source_path, in rows)
+
+
+def get_old_screenshots(
+    upload_dir: Path,
+    retention_days: int,
+    include_failed: bool = False,
+    failed_names: frozenset[str] = frozenset(),
+) -> tuple[list[Path], list[Path]]:
     """
     Find screenshots older than retention period.
 
+    Files named in failed_names (see load_failed_names) count as failures, as
+    do files with "error" or "failed" in their name.
+
     Returns:
         Tuple of (successful_screenshots, failed_screenshots)
     """
@@ -42,11 +78,18 @@ def get_old_screenshots(upload_dir: Path, retention_days: int, include_failed: b
         logger.info(f"Upload directory does not exist: {upload_dir}")
         return [], []
 
-    all_screenshots = sorted(
-        list(upload_dir.glob("*.jpg")) +
-        list(upload_dir.glob("*.png")) +
-        list(upload_dir.glob("*.jpeg"))
-    )
+    # One directory pass: scandir yields each entry with its type cached and
+    # stats it at most once, instead of a glob walk per extension and a
+    # second stat() for the age check
+    with os.scandir(upload_dir) as entries:
+        all_screenshots = sorted(
+            (
+                (Path(entry.path), entry.stat().st_mtime)
+                for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(SCREENSHOT_EXTENSIONS)
+            ),
+            key=lambda screenshot: screenshot[0],
+        )
 
     if not all_screenshots:
         logger.info(f"No screenshots found in {upload_dir}")
@@ -58,32 +101,60 @@ def get_old_screenshots(upload_dir: Path, retention_days: int, include_failed: b
     cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
     logger.info(f"Retention cutoff: {cutoff.isoformat()} ({retention_days} days ago)")
 
-    successful_old = []
-    failed_old = []
-
-    for screenshot in all_screenshots:
-        # Get file modification time
-        file_mtime = datetime.fromtimestamp(screenshot.stat().st_mtime, tz=timezone.utc)
+    # Ages are compared as raw st_mtime floats; a datetime is only built for
+    # the debug log line, and only when debug logging is on
+    cutoff_ts = cutoff.timestamp()
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    successful_paths = []
+    failed_paths = []
+
+    for screenshot, mtime in all_screenshots:
+        # Modification time comes from the stat taken during the scan
+        if mtime >= cutoff_ts:
+            continue
+
+        # Failures recorded in the database, plus the name heuristic for
+        # files the database doesn't know about
+        name = screenshot.name.lower()
+        if screenshot.name in failed_names or "error" in name or "failed" in name:
+            failed_paths.append(screenshot)
+            kind = "failed"
+        else:
+            successful_paths.append(screenshot)
+            kind = "successful"
+
+        if debug:
+            file_mtime = datetime.fromtimestamp(mtime, tz=timezone.utc)
+            logger.debug(f"Old {kind} screenshot: {screenshot.name} (age: {file_mtime})")
+
+    logger.info(f"Found {len(successful_paths)} old successful screenshot(s)")
+    if include_failed:
+        logger.info(f"Found {len(failed_paths)} old failed screenshot(s)")
+    else:
+        failed_paths = []
 
-        if file_mtime < cutoff:
-            # Heuristic: assume files with "error" or "failed" in name are failures
-            # In production, you might track this in database
-            if "error" in screenshot.name.lower() or "failed" in screenshot.name.lower():
-                failed_old.append((screenshot, file_mtime))
-                logger.debug(f"Old failed screenshot: {screenshot.name} (age: {file_mtime})")
-            else:
-                successful_old.append((screenshot, file_mtime))
-                logger.debug(f"Old successful screenshot: {screenshot.name} (age: {file_mtime})")
+    return successful_paths, failed_paths
 
-    logger.info(f"Found {len(successful_old)} old successful screenshot(s)")
-    if include_failed:
-        logger.info(f"Found {len(failed_old)} old failed screenshot(s)")
 
-    # Extract just the paths
-    successful_paths = [s[0] for s in successful_old]
-    failed_paths = [s[0] for s in failed_old] if include_failed else []
+def delete_screenshot(screenshot: Path, dry_run: bool = False) -> tuple[int, str | None]:
+    """
+    Delete one screenshot file.
 
-    return successful_paths, failed_paths
+    Returns:
+        Tuple of (size in bytes, error): error is None on success, "missing"
+        if the file is already gone, or the OS error message
+    """
+    try:
+        # No exists() pre-check: a vanished file surfaces as FileNotFoundError
+        size = screenshot.stat().st_size
+        if not dry_run:
+            screenshot.unlink()
+        return size, None
+    except FileNotFoundError:
+        return 0, "missing"
+    except OSError as e:
+        return 0, str(e)
 
 
 def delete_screenshots(screenshots: list[Path], dry_run: bool = False) -> dict[str, int]:
@@ -103,26 +174,24 @@ def delete_screenshots(screenshots: list[Path], dry_run: bool = False) -> dict[s
     failed = 0
     skipped = 0
 
-    for screenshot in screenshots:
-        try:
-            if not screenshot.exists():
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as pool:
+        results = pool.map(lambda screenshot: delete_screenshot(screenshot, dry_run), screenshots)
+
+        # map() yields in input order, so the log reads as before
+        for screenshot, (size, error) in zip(screenshots, results):
+            if error == "missing":
                 logger.warning(f"  ⊙ Skipped (not found): {screenshot.name}")
                 skipped += 1
-                continue
-
-            if dry_run:
-                logger.info(f"  [DRY RUN] Would delete: {screenshot.name} ({screenshot.stat().st_size} bytes)")
+            elif error is not None:
+                logger.error(f"  ✗ Failed to delete {screenshot.name}: {error}")
+                failed += 1
+            elif dry_run:
+                logger.info(f"  [DRY RUN] Would delete: {screenshot.name} ({size} bytes)")
                 deleted += 1
             else:
-                size = screenshot.stat().st_size
-                screenshot.unlink()
                 logger.info(f"  ✓ Deleted: {screenshot.name} ({size} bytes)")
                 deleted += 1
 
-        except Exception as e:
-            logger.error(f"  ✗ Failed to delete {screenshot.name}: {e}")
-            failed += 1
-
     logger.info(f"\nSummary: {deleted} deleted, {failed} failed, {skipped} skipped")
     return {"deleted": deleted, "failed": failed, "skipped": skipped}
 
@@ -147,7 +216,9 @@ def main():
     logger.info(f"Dry run: {args.dry_run}")
     logger.info("=" * 80)
 
-    successful, failed = get_old_screenshots(upload_dir, retention_days, args.include_failed)
+    successful, failed = get_old_screenshots(
+        upload_dir, retention_days, args.include_failed, load_failed_names()
+    )
 
     total_to_delete = successful + failed
 
@@ -1,16 +1,38 @@
 #!/usr/bin/env python3
 """Find potential duplicate players in the database."""
+import argparse
+import math
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import difflib
-from sqlalchemy import create_engine, select
+from collections import defaultdict
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from observatory.db import models
-from observatory.settings import settings
+from observatory.db.player_matching import candidate_name_pairs, name_similarity
+from observatory.db.session import get_engine
+
+try:
+    # Optional: scores every pair in C; without it the pure-Python difflib
+    # scan below is used. rapidfuzz's cdist needs NumPy, so it comes along.
+    import numpy as np
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
+try:
+    # Optional: MinHash LSH (--lsh) narrows large player lists to colliding pairs
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    MinHashLSH = None
+
+LSH_NUM_PERM = 128
+# Jaccard similarity of 3-gram sets LSH aims to catch; set well under the
+# name-ratio threshold so near matches still collide
+LSH_JACCARD_THRESHOLD = 0.5
 
 def load_exclusions():
     """Load player pairs that should not be merged."""
@@ -31,67 +53,227 @@ def load_exclusions():
                             pass
     return exclusions
 
-def find_duplicates(players, threshold=0.80):
-    """Find potential duplicate players based on name similarity."""
-    exclusions = load_exclusions()
-    duplicates = []
-    checked = set()
-
-    for i, player1 in enumerate(players):
-        if player1.id in checked:
-            continue
-
-        matches = [player1]
-        for player2 in players[i+1:]:
-            if player2.id in checked:
-                continue
-
-            # Check if this pair is in the exclusion list
-            pair = (min(player1.id, player2.id), max(player1.id, player2.id))
-            if pair in exclusions:
+def uses_rapidfuzz(use_lsh=False):
+    """Whether the pair scan scores names with rapidfuzz rather than difflib."""
+    return process is not None and not use_lsh
+
+def rapidfuzz_similarity(name1, name2):
+    """rapidfuzz's Indel ratio of two names (0.0-1.0), as rapidfuzz_pairs scores them."""
+    return fuzz.ratio(name1, name2) / 100
+
+def rapidfuzz_pairs(names, threshold):
+    """
+    Yield the (i, j, similarity) triples, i < j, whose names reach the
+    threshold (similarity as 0.0-1.0).
+
+    The whole similarity matrix is computed in one cdist call (scores below
+    the cutoff come back as 0) and the passing upper-triangle pairs are picked
+    out with NumPy, so no Python loop runs over the N x N scores. The matrix
+    holds uint8 whole percents, a quarter of the default float32's memory;
+    they are rounded, so the matrix only narrows the pairs down and each
+    passing pair is scored again exactly against the threshold.
+    """
+    cutoff = threshold * 100
+    # Any score at or above the cutoff rounds to at least floor(cutoff)
+    floor_cutoff = math.floor(cutoff)
+    scores = process.cdist(
+        names, names, scorer=fuzz.ratio, score_cutoff=floor_cutoff, dtype=np.uint8, workers=-1
+    )
+    rows, cols = np.nonzero(np.triu(scores >= floor_cutoff, k=1))
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        score = fuzz.ratio(names[i], names[j])
+        if score >= cutoff:
+            yield i, j, score / 100
+
+def difflib_pairs(names, threshold):
+    """Yield the (i, j, similarity) triples, i < j, whose names reach the threshold."""
+    lengths = [len(name) for name in names]
+    candidates = candidate_name_pairs(names, threshold)
+
+    # Only pairs that share enough characters can reach the threshold
+    for i, later in candidates.items():
+        for j in later:
+            # Length gate: the ratio 2*M / (len1 + len2) can never exceed
+            # 2*min(len1, len2) / (len1 + len2), so pairs whose lengths alone
+            # rule the threshold out are skipped before any other work (the
+            # bound is computed as difflib computes the ratio, so rounding
+            # never gates out a pair exactly at threshold)
+            total = lengths[i] + lengths[j]
+            if total and 2.0 * min(lengths[i], lengths[j]) / total < threshold:
                 continue
 
-            # Calculate similarity
-            similarity = difflib.SequenceMatcher(
-                None,
-                player1.name.lower(),
-                player2.name.lower()
-            ).ratio()
-
+            # Same scorer as merge_duplicate_players.py, so both scripts
+            # agree on which pairs match
+            similarity = name_similarity(names[i], names[j])
             if similarity >= threshold:
-                matches.append(player2)
-                checked.add(player2.id)
+                yield i, j, similarity
+
+def name_shingles(name):
+    """Character 3-grams of a name (the whole name if it is shorter)."""
+    return {name[k:k + 3] for k in range(len(name) - 2)} or {name}
+
+def lsh_pairs(names, threshold):
+    """
+    Yield the (i, j, similarity) triples, i < j, whose names reach the
+    threshold, scoring only pairs that collide in a MinHash LSH band.
+
+    Signatures are MinHashes of each name's character 3-grams, so the work
+    grows with the number of names rather than the number of pairs. This is
+    approximate: a matching pair whose 3-grams overlap too little is missed
+    (a one-letter OCR misread such as "kaiser"/"kalser" shares only 1 of 7
+    3-grams), so it is only used when asked for with --lsh. Colliding pairs
+    are scored with the same difflib ratio merge_duplicate_players.py uses.
+    """
+    lsh = MinHashLSH(threshold=LSH_JACCARD_THRESHOLD, num_perm=LSH_NUM_PERM)
+    signatures = []
+    for i, name in enumerate(names):
+        signature = MinHash(num_perm=LSH_NUM_PERM)
+        for shingle in name_shingles(name):
+            signature.update(shingle.encode("utf-8"))
+        lsh.insert(i, signature)
+        signatures.append(signature)
+
+    for i, signature in enumerate(signatures):
+        for j in sorted(k for k in lsh.query(signature) if k > i):
+            similarity = name_similarity(names[i], names[j])
+            if similarity >= threshold:
+                yield i, j, similarity
+
+def matching_pairs(players, names, threshold, exclusions, use_lsh=False):
+    """Yield the matching (i, j, similarity) triples that are not excluded."""
+    if use_lsh:
+        pairs = lsh_pairs
+    elif uses_rapidfuzz(use_lsh):
+        pairs = rapidfuzz_pairs
+    else:
+        pairs = difflib_pairs
+    for i, j, similarity in pairs(names, threshold):
+        # Check if this pair is in the exclusion list
+        id1, id2 = players[i].id, players[j].id
+        if (min(id1, id2), max(id1, id2)) not in exclusions:
+            yield i, j, similarity
+
+def find_duplicates(players, threshold=0.80, use_lsh=False):
+    """
+    Find potential duplicate players based on name similarity.
+
+    Matching pairs are merged with union-find, so groups are transitive
+    (A~B and B~C put A, B and C together even if A and C don't match).
+    Two groups are never joined if that would put a pair listed in
+    not_duplicates.txt in the same group. Groups keep the players' order, by
+    their first member.
+
+    Returns a list of groups, each a list of (player, similarity to the
+    group's first player) tuples; the similarities come from the pair scan,
+    so only members joined through another player are scored again, with the
+    same scorer.
+    """
+    exclusions = load_exclusions()
+    names = [player.name.lower() for player in players]
+    parent = list(range(len(players)))
+    members = [{i} for i in range(len(players))]
+
+    # Excluded pairs by player index, for checking whole groups
+    index_of = {player.id: i for i, player in enumerate(players)}
+    excluded = defaultdict(set)
+    for id1, id2 in exclusions:
+        if id1 in index_of and id2 in index_of:
+            excluded[index_of[id1]].add(index_of[id2])
+            excluded[index_of[id2]].add(index_of[id1])
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rescore = rapidfuzz_similarity if uses_rapidfuzz(use_lsh) else name_similarity
+    similarities = {}
+    for i, j, similarity in matching_pairs(players, names, threshold, exclusions, use_lsh):
+        root_i, root_j = find(i), find(j)
+        if root_i == root_j:
+            similarities[i, j] = similarity
+            continue
+        group_i, group_j = members[root_i], members[root_j]
+        if any(not excluded[k].isdisjoint(group_j) for k in group_i if k in excluded):
+            # Joining would make an excluded pair duplicates of each other
+            continue
+        similarities[i, j] = similarity
+        # The earlier player stays the root, so it leads its group
+        root, child = min(root_i, root_j), max(root_i, root_j)
+        parent[child] = root
+        members[root] |= members[child]
+        members[child] = set()
 
-        if len(matches) > 1:
-            duplicates.append(matches)
-            checked.add(player1.id)
+    groups = defaultdict(list)
+    for i in range(len(players)):
+        groups[find(i)].append(i)
+
+    duplicates = []
+    for first, *others in groups.values():
+        if not others:
+            continue
+        group = [(players[first], 1.0)]
+        for i in others:
+            similarity = similarities.get((first, i))
+            if similarity is None:
+                similarity = rescore(names[first], names[i])
+            group.append((players[i], similarity))
+        duplicates.append(group)
 
     return duplicates
 
 def main():
     """Find and display duplicate players."""
-    threshold = 0.80  # 80% similarity
-    if len(sys.argv) > 1:
-        threshold = float(sys.argv[1])
-
-    engine = create_engine(settings.database_url)
+    parser = argparse.ArgumentParser(description="Find potential duplicate players")
+    parser.add_argument(
+        "threshold",
+        type=float,
+        nargs="?",
+        default=0.80,
+        help="Name similarity threshold, 0.0-1.0 (default: 0.80)",
+    )
+    parser.add_argument(
+        "--lsh",
+        action="store_true",
+        help="Only score pairs whose MinHash signatures collide. Faster on very "
+             "large lists, but can miss one-letter misreads. Needs the optional "
+             "datasketch package (pip install datasketch)",
+    )
+    args = parser.parse_args()
+    threshold = args.threshold
+    if args.lsh and MinHashLSH is None:
+        parser.error("--lsh needs the datasketch package (pip install datasketch)")
+
+    engine = get_engine()
 
     print("=" * 100)
     print(f"DUPLICATE PLAYER FINDER (Threshold: {threshold:.0%})")
     print("=" * 100)
 
     with Session(engine) as session:
-        # Get all active players
+        # Get all active players: only the columns the report uses, as plain
+        # rows (no ORM objects or identity map); the scan needs them all at once
         players = session.execute(
-            select(models.Player)
+            select(
+                models.Player.id,
+                models.Player.name,
+                models.Player.current_power,
+                models.Player.current_furnace,
+            )
             .where(models.Player.alliance_id == 1)
             .order_by(models.Player.name)
-        ).scalars().all()
+        ).all()
 
         print(f"\nTotal players in alliance: {len(players)}")
+        if uses_rapidfuzz(args.lsh):
+            print(
+                "Scores are rapidfuzz Indel ratios, not the difflib ratios "
+                "merge_duplicate_players.py uses; they can differ slightly"
+            )
 
         # Find duplicates
-        duplicates = find_duplicates(players, threshold)
+        duplicates = find_duplicates(players, threshold, use_lsh=args.lsh)
 
         if not duplicates:
             print(f"\n✓ No duplicate players found at {threshold:.0%} similarity threshold!")
@@ -103,22 +285,12 @@ def main():
         for group_num, group in enumerate(duplicates, 1):
             print(f"{'Group ' + str(group_num):-^100}")
 
-            # Calculate similarities between all pairs in group
-            for i, player in enumerate(group):
+            # Similarity to the first player in group, from find_duplicates
+            for player, similarity in group:
                 power_str = f"{player.current_power:,}" if player.current_power else "N/A"
                 furnace_str = f"FC{player.current_furnace}" if player.current_furnace else "N/A"
 
-                # Show similarity to first player in group
-                if i == 0:
-                    similarity = 100.0
-                else:
-                    similarity = difflib.SequenceMatcher(
-                        None,
-                        group[0].name.lower(),
-                        player.name.lower()
-                    ).ratio() * 100
-
-                print(f"  {player.id:3d}. '{player.name:30s}' | Power: {power_str:>15s} | {furnace_str:5s} | {similarity:.1f}% match")
+                print(f"  {player.id:3d}. '{player.name:30s}' | Power: {power_str:>15s} | {furnace_str:5s} | {similarity:.1%} match")
                 total_duplicates += 1
 
             print()
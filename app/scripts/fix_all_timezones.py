@@ -6,54 +6,100 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.custom_types import sqlite_utc_text
+from observatory.db.session import get_engine
+
+
+def naive(col):
+    """
+    SQL predicate: the column holds a timestamp without timezone info.
+
+    Timezone info can only be a trailing 'Z' or '+HH:MM'/'-HH:MM', so the
+    test looks at fixed positions from the end instead of scanning the whole
+    string with '%+%' patterns (which also missed negative offsets).
+    """
+    return (
+        f"({col} IS NOT NULL AND substr({col}, -1) <> 'Z' "
+        f"AND NOT (substr({col}, -6, 1) IN ('+', '-') AND substr({col}, -3, 1) = ':'))"
+    )
+
+# All tables and datetime columns that need fixing
+TABLES_TO_FIX = [
+    ('players', ['created_at', 'updated_at']),
+    ('player_power_history', ['captured_at', 'created_at']),
+    ('player_furnace_history', ['captured_at', 'created_at']),
+    ('contribution_snapshots', ['week_start_date', 'snapshot_date', 'recorded_at', 'created_at']),
+    ('foundry_events', ['event_date', 'created_at']),
+    ('foundry_signups', ['recorded_at', 'created_at']),
+    ('foundry_results', ['recorded_at', 'created_at']),
+    ('ac_events', ['week_start_date', 'created_at']),
+    ('ac_signups', ['recorded_at', 'created_at']),
+    ('screenshots', ['created_at', 'processed_at']),
+    ('event_stats', ['captured_at']),
+]
+
+
+def build_update(table, columns):
+    """
+    Build the UPDATE that rewrites every naive column of a table's rows.
+
+    One UPDATE per table rewrites all naive columns of a row at once, so each
+    table is scanned a single time. Naive values are UTC; sqlite_utc_text()
+    writes the same fixed-width text TZDateTime uses, keeping every fractional
+    digit (values it can't parse are left unchanged).
+    """
+    assignments = ", ".join(
+        f"{col} = CASE WHEN {naive(col)} "
+        f"THEN COALESCE({sqlite_utc_text(col)}, {col}) ELSE {col} END"
+        for col in columns
+    )
+    return f"""
+        UPDATE {table}
+        SET {assignments}
+        WHERE {" OR ".join(naive(col) for col in columns)}
+    """
+
+
+# Every statement is built once, at import time
+UPDATE_STATEMENTS = [
+    (table, columns, build_update(table, columns)) for table, columns in TABLES_TO_FIX
+]
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
-
-    # All tables and datetime columns that need fixing
-    tables_to_fix = [
-        ('players', ['created_at', 'updated_at']),
-        ('player_power_history', ['captured_at', 'created_at']),
-        ('player_furnace_history', ['captured_at', 'created_at']),
-        ('contribution_snapshots', ['week_start_date', 'snapshot_date', 'recorded_at', 'created_at']),
-        ('foundry_events', ['event_date', 'created_at']),
-        ('foundry_signups', ['recorded_at', 'created_at']),
-        ('foundry_results', ['recorded_at', 'created_at']),
-        ('ac_events', ['week_start_date', 'created_at']),
-        ('ac_signups', ['recorded_at', 'created_at']),
-        ('screenshots', ['created_at', 'processed_at']),
-        ('event_stats', ['captured_at']),
-    ]
+    """Rewrite every naive timestamp as UTC, printing progress."""
+    engine = get_engine()
 
     with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            # Bulk rewrite in one transaction: skip the per-commit fsync
+            # wait and keep temp b-trees in memory for this connection
+            conn.exec_driver_sql("PRAGMA synchronous=NORMAL")
+            conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+
         print("=" * 60)
         print("Converting ALL timestamps to timezone-aware UTC...")
         print("=" * 60)
 
         total_updated = 0
 
-        for table, columns in tables_to_fix:
+        for table, columns, update in UPDATE_STATEMENTS:
             print(f"\nProcessing table: {table}")
 
-            for col in columns:
-                result = conn.execute(text(f"""
-                    UPDATE {table}
-                    SET {col} = {col} || '+00:00'
-                    WHERE {col} IS NOT NULL
-                    AND {col} NOT LIKE '%+%'
-                    AND {col} NOT LIKE '%Z'
-                """))
+            # On SQLite the prebuilt SQL goes straight to the driver, skipping
+            # SQLAlchemy's text() parsing and compilation per statement
+            if conn.dialect.name == "sqlite":
+                result = conn.exec_driver_sql(update)
+            else:
+                result = conn.execute(text(update))
 
-                count = result.rowcount
-                if count > 0:
-                    print(f"  ✓ {col}: {count} timestamps updated")
-                    total_updated += count
+            count = result.rowcount
+            if count > 0:
+                print(f"  ✓ {count} rows updated ({', '.join(columns)})")
+                total_updated += count
 
         print("\n" + "=" * 60)
-        print(f"✓ Total: {total_updated} timestamps converted to UTC")
+        print(f"✓ Total: {total_updated} rows converted to UTC")
         print("=" * 60)
 
 if __name__ == "__main__":
@@ -6,12 +6,24 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.custom_types import sqlite_utc_text
+from observatory.db.session import get_engine
+
+# Timezone info is a trailing 'Z' or '+HH:MM'/'-HH:MM'; checking those fixed
+# positions avoids scanning every string for '%+%'
+NAIVE_STARTED_AT = (
+    "substr(started_at, -1) <> 'Z' "
+    "AND NOT (substr(started_at, -6, 1) IN ('+', '-') AND substr(started_at, -3, 1) = ':')"
+)
+NAIVE_ENDED_AT = (
+    "ended_at IS NOT NULL AND substr(ended_at, -1) <> 'Z' "
+    "AND NOT (substr(ended_at, -6, 1) IN ('+', '-') AND substr(ended_at, -3, 1) = ':')"
+)
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
+    """Rewrite naive bear event timestamps as UTC, printing progress."""
+    engine = get_engine()
 
     with engine.begin() as conn:
         print("=" * 60)
@@ -19,9 +31,9 @@ def main():
         print("=" * 60)
 
         # Check current state
-        result = conn.execute(text("""
+        result = conn.execute(text(f"""
             SELECT COUNT(*) FROM bear_events
-            WHERE started_at NOT LIKE '%+%' AND started_at NOT LIKE '%Z'
+            WHERE {NAIVE_STARTED_AT}
         """))
         naive_count = result.scalar()
 
@@ -31,25 +43,24 @@ def main():
             print("✓ All timestamps are already timezone-aware!")
             return
 
-        # For SQLite, we need to append timezone info
-        # Assuming all existing timestamps are UTC
+        # Assuming all existing timestamps are UTC, rewrite them as the
+        # fixed-width UTC text TZDateTime stores (unparseable values are kept)
         print("\nConverting timestamps to UTC format...")
 
         # Update started_at
-        result = conn.execute(text("""
+        result = conn.execute(text(f"""
             UPDATE bear_events
-            SET started_at = started_at || '+00:00'
-            WHERE started_at NOT LIKE '%+%' AND started_at NOT LIKE '%Z'
+            SET started_at = COALESCE({sqlite_utc_text('started_at')}, started_at)
+            WHERE {NAIVE_STARTED_AT}
         """))
 
         print(f"✓ Updated {result.rowcount} started_at timestamps")
 
         # Update ended_at (if not null)
-        result = conn.execute(text("""
+        result = conn.execute(text(f"""
             UPDATE bear_events
-            SET ended_at = ended_at || '+00:00'
-            WHERE ended_at IS NOT NULL
-            AND ended_at NOT LIKE '%+%' AND ended_at NOT LIKE '%Z'
+            SET ended_at = COALESCE({sqlite_utc_text('ended_at')}, ended_at)
+            WHERE {NAIVE_ENDED_AT}
         """))
 
         print(f"✓ Updated {result.rowcount} ended_at timestamps")
@@ -70,10 +81,10 @@ def main():
         print("=" * 60)
 
         for event in result.fetchall():
-            print(f"\nEvent ID {event[0]}:")
-            print(f"  started_at: {event[1]}")
-            if event[2]:
-                print(f"  ended_at: {event[2]}")
+            print(f"\nEvent ID {event.id}:")
+            print(f"  started_at: {event.started_at}")
+            if event.ended_at:
+                print(f"  ended_at: {event.ended_at}")
 
         print("\n✓ All bear event timestamps converted to timezone-aware UTC!")
 
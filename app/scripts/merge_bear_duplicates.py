@@ -1,97 +1,126 @@
 #!/usr/bin/env python3
 """Merge duplicate bear events that occurred on the same day."""
 import sys
+from itertools import groupby
+from operator import attrgetter
 from pathlib import Path
-from datetime import datetime, timedelta
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from sqlalchemy import create_engine, text
-from observatory.settings import Settings
+from sqlalchemy import text
+from observatory.db.session import get_engine
 
 def main():
-    settings = Settings()
-    engine = create_engine(settings.database_url)
+    engine = get_engine()
 
     with engine.begin() as conn:
         print("=" * 60)
         print("Finding bear events to merge...")
         print("=" * 60)
 
-        # Find groups of events within 24 hours of each other for the same trap
-        result = conn.execute(text("""
+        # Map every duplicate event to the primary (earliest) event of its
+        # alliance/trap/day group in SQL, so the merge below is three
+        # set-based statements instead of three per duplicate event
+        conn.execute(text("""
+            CREATE TEMP TABLE bear_event_merge AS
+            SELECT id AS dup_id, keep_id, event_order
+            FROM (
+                SELECT
+                    id,
+                    FIRST_VALUE(id) OVER w AS keep_id,
+                    ROW_NUMBER() OVER w AS event_order
+                FROM bear_events
+                WINDOW w AS (
+                    PARTITION BY alliance_id, trap_id, DATE(started_at)
+                    ORDER BY started_at, id
+                )
+            ) AS grouped
+            WHERE id <> keep_id
+        """))
+        # Both merge steps look duplicates up by id and earlier duplicates
+        # by group; the indexes go away with the temp table
+        conn.execute(text("CREATE INDEX ix_bear_event_merge_dup ON bear_event_merge (dup_id)"))
+        conn.execute(text(
+            "CREATE INDEX ix_bear_event_merge_group ON bear_event_merge (keep_id, event_order)"
+        ))
+
+        # Rows arrive sorted by group, so each group is printed as it streams
+        # past instead of collecting every merge into a dict first
+        merges = conn.execution_options(stream_results=True, yield_per=1000).execute(text("""
             SELECT
-                id,
-                alliance_id,
-                trap_id,
-                started_at,
-                ended_at,
-                rally_count,
-                total_damage,
-                DATE(started_at) as event_date
-            FROM bear_events
-            ORDER BY alliance_id, trap_id, started_at
+                m.keep_id,
+                keep.trap_id,
+                DATE(keep.started_at) as event_date,
+                keep.started_at as keep_started_at,
+                m.dup_id,
+                dup.started_at as dup_started_at
+            FROM bear_event_merge m
+            JOIN bear_events keep ON keep.id = m.keep_id
+            JOIN bear_events dup ON dup.id = m.dup_id
+            ORDER BY keep.alliance_id, keep.trap_id, keep.started_at, m.keep_id, m.event_order
         """))
 
-        events = result.fetchall()
-
-        # Group events by alliance, trap, and date
-        event_groups = {}
-        for event in events:
-            key = (event[1], event[2], event[7])  # alliance_id, trap_id, event_date
-            if key not in event_groups:
-                event_groups[key] = []
-            event_groups[key].append(event)
-
         total_merged = 0
-
-        for key, group in event_groups.items():
-            if len(group) <= 1:
-                continue
-
-            alliance_id, trap_id, event_date = key
-            print(f"\nFound {len(group)} events for Trap {trap_id} on {event_date}:")
-
-            # Keep the first event, merge others into it
-            primary_event = group[0]
-            events_to_merge = group[1:]
-
-            print(f"  Primary event: ID {primary_event[0]} at {primary_event[3]}")
-
-            for dup_event in events_to_merge:
-                print(f"  Merging event: ID {dup_event[0]} at {dup_event[3]}")
-
-                # Move all scores from duplicate event to primary event
-                result = conn.execute(text("""
-                    UPDATE bear_scores
-                    SET bear_event_id = :primary_id
-                    WHERE bear_event_id = :dup_id
-                    AND player_id NOT IN (
-                        SELECT player_id FROM bear_scores WHERE bear_event_id = :primary_id
-                    )
-                """), {"primary_id": primary_event[0], "dup_id": dup_event[0]})
-
-                moved_scores = result.rowcount
-                if moved_scores > 0:
-                    print(f"    Moved {moved_scores} unique scores")
-
-                # Delete duplicate scores (same player in both events)
-                result = conn.execute(text("""
-                    DELETE FROM bear_scores
-                    WHERE bear_event_id = :dup_id
-                """), {"dup_id": dup_event[0]})
-
-                deleted_scores = result.rowcount
-                if deleted_scores > 0:
-                    print(f"    Deleted {deleted_scores} duplicate scores")
-
-                # Delete the duplicate event
-                conn.execute(text("""
-                    DELETE FROM bear_events WHERE id = :dup_id
-                """), {"dup_id": dup_event[0]})
-
-                total_merged += 1
+        for _, group in groupby(merges, key=attrgetter("keep_id")):
+            group = list(group)
+            first = group[0]
+            print(f"\nFound {len(group) + 1} events for Trap {first.trap_id} on {first.event_date}:")
+            print(f"  Primary event: ID {first.keep_id} at {first.keep_started_at}")
+            for merge in group:
+                print(f"  Merging event: ID {merge.dup_id} at {merge.dup_started_at}")
+            total_merged += len(group)
+
+        if total_merged:
+            # Pick the scores to move to the primary event: those whose player
+            # has no score there or in an earlier duplicate (which wins, as it
+            # would have been moved first). Deciding this in a separate read
+            # keeps the UPDATE from seeing its own half-applied changes.
+            conn.execute(text("""
+                CREATE TEMP TABLE bear_score_moves AS
+                SELECT s.id, m.keep_id
+                FROM bear_scores s
+                JOIN bear_event_merge m ON m.dup_id = s.bear_event_id
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM bear_scores kept
+                    WHERE kept.bear_event_id = m.keep_id
+                    AND kept.player_id = s.player_id
+                )
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM bear_event_merge earlier
+                    JOIN bear_scores other ON other.bear_event_id = earlier.dup_id
+                    WHERE earlier.keep_id = m.keep_id
+                    AND earlier.event_order < m.event_order
+                    AND other.player_id = s.player_id
+                )
+            """))
+            conn.execute(text("CREATE INDEX ix_bear_score_moves_id ON bear_score_moves (id)"))
+
+            result = conn.execute(text("""
+                UPDATE bear_scores
+                SET bear_event_id = (
+                    SELECT keep_id FROM bear_score_moves mv WHERE mv.id = bear_scores.id
+                )
+                WHERE id IN (SELECT id FROM bear_score_moves)
+            """))
+            print(f"\n  Moved {result.rowcount} unique scores")
+            conn.execute(text("DROP TABLE bear_score_moves"))
+
+            # Delete duplicate scores (same player in both events)
+            result = conn.execute(text("""
+                DELETE FROM bear_scores
+                WHERE bear_event_id IN (SELECT dup_id FROM bear_event_merge)
+            """))
+            print(f"  Deleted {result.rowcount} duplicate scores")
+
+            # Delete the duplicate events
+            conn.execute(text("""
+                DELETE FROM bear_events
+                WHERE id IN (SELECT dup_id FROM bear_event_merge)
+            """))
+
+        conn.execute(text("DROP TABLE bear_event_merge"))
 
         print("\n" + "=" * 60)
         print(f"✓ Merged {total_merged} duplicate bear events")
@@ -99,16 +128,24 @@ def main():
 
         # Show remaining events
         print("\nRemaining bear events:")
+        # The 20 events are picked first, then their scores counted in one
+        # grouped join rather than a correlated COUNT per event
         result = conn.execute(text("""
             SELECT
-                id,
-                alliance_id,
-                trap_id,
-                started_at,
-                (SELECT COUNT(*) FROM bear_scores WHERE bear_event_id = bear_events.id) as score_count
-            FROM bear_events
-            ORDER BY started_at DESC
-            LIMIT 20
+                e.id,
+                e.alliance_id,
+                e.trap_id,
+                e.started_at,
+                COUNT(s.id) as score_count
+            FROM (
+                SELECT id, alliance_id, trap_id, started_at
+                FROM bear_events
+                ORDER BY started_at DESC
+                LIMIT 20
+            ) e
+            LEFT JOIN bear_scores s ON s.bear_event_id = e.id
+            GROUP BY e.id, e.alliance_id, e.trap_id, e.started_at
+            ORDER BY e.started_at DESC
         """))
 
         events = result.fetchall()
@@ -6,34 +6,47 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import difflib
-from sqlalchemy import create_engine, select, text
+from sqlalchemy import bindparam, select, text
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
 from observatory.db import models
-from observatory.settings import settings
+from observatory.db.player_matching import candidate_name_pairs, name_similarity
+from observatory.db.session import get_engine
 
 def find_duplicates(players, threshold=0.80):
-    """Find potential duplicate players based on name similarity."""
+    """
+    Find potential duplicate players based on name similarity.
+
+    Returns a list of groups, each a list of (player, similarity to the
+    group's first player) tuples; the first player scores 1.0.
+    """
     duplicates = []
     checked = set()
+    names = [player.name.lower() for player in players]
+    lengths = [len(name) for name in names]
+    candidates = candidate_name_pairs(names, threshold)
 
     for i, player1 in enumerate(players):
         if player1.id in checked:
             continue
 
-        matches = [player1]
-        for player2 in players[i+1:]:
+        matches = [(player1, 1.0)]
+        # Only later players sharing enough characters can reach the
+        # threshold; they come in the same order as a full scan would
+        for j in candidates.get(i, ()):
+            player2 = players[j]
             if player2.id in checked:
                 continue
 
-            similarity = difflib.SequenceMatcher(
-                None,
-                player1.name.lower(),
-                player2.name.lower()
-            ).ratio()
+            # The ratio 2*M / (len1 + len2) is at most 2*min / (len1 + len2),
+            # so lengths alone rule some pairs out before they are scored
+            total = lengths[i] + lengths[j]
+            if total and 2.0 * min(lengths[i], lengths[j]) / total < threshold:
+                continue
 
-            if similarity >= threshold:
-                matches.append(player2)
+            score = name_similarity(names[i], names[j])
+            if score >= threshold:
+                matches.append((player2, score))
                 checked.add(player2.id)
 
         if len(matches) > 1:
@@ -42,58 +55,127 @@ def find_duplicates(players, threshold=0.80):
 
     return duplicates
 
-def merge_players(session: Session, keep_id: int, merge_ids: list[int], dry_run: bool = True):
+# Tables with player_id foreign key
+PLAYER_TABLES = [
+    "bear_scores",
+    "foundry_results",
+    "foundry_signups",
+    "ac_signups",
+    "contribution_snapshots",
+    "player_power_history",
+    "player_furnace_history",
+]
+
+def count_player_records(session: Session, player_ids: list[int]) -> dict[str, dict[int, int]]:
     """
-    Merge duplicate players into one.
+    Count the rows each player owns in every player_id table.
 
-    Args:
-        session: Database session
-        keep_id: Player ID to keep
-        merge_ids: List of player IDs to merge into keep_id
-        dry_run: If True, don't commit changes
-    """
-    # Tables with player_id foreign key
-    tables = [
-        "bear_scores",
-        "foundry_results",
-        "foundry_signups",
-        "ac_signups",
-        "contribution_snapshots",
-        "player_power_history",
-        "player_furnace_history",
-    ]
+    One grouped query per table covers all players, instead of one COUNT per
+    table per duplicate group.
 
+    Returns:
+        Dict of table -> {player_id: row count}
+    """
+    postgres = session.get_bind().dialect.name == "postgresql"
+    counts = {}
+    for table in PLAYER_TABLES:
+        if postgres:
+            # One array parameter: the same statement text for any number of ids
+            query = text(
+                f"SELECT player_id, COUNT(*) FROM {table} WHERE player_id = ANY(:ids) GROUP BY player_id"
+            )
+        else:
+            query = text(
+                f"SELECT player_id, COUNT(*) FROM {table} WHERE player_id IN :ids GROUP BY player_id"
+            ).bindparams(bindparam("ids", expanding=True))
+        counts[table] = dict(session.execute(query, {"ids": player_ids}).all())
+    return counts
+
+def print_merge_plan(keep_id: int, merge_ids: list[int], counts: dict[str, dict[int, int]]):
+    """Print the rows that merging merge_ids into keep_id would move."""
     print(f"\n{'Merge Plan':-^80}")
     print(f"Keep player ID: {keep_id}")
     print(f"Merge player IDs: {', '.join(map(str, merge_ids))}")
     print()
 
     total_records = 0
-    for table in tables:
-        count_query = text(f"SELECT COUNT(*) FROM {table} WHERE player_id IN ({','.join(map(str, merge_ids))})")
-        count = session.execute(count_query).scalar()
+    for table in PLAYER_TABLES:
+        count = sum(counts[table].get(player_id, 0) for player_id in merge_ids)
 
         if count > 0:
             print(f"  {table:30s}: {count:4d} records to update")
             total_records += count
 
-            if not dry_run:
-                update_query = text(
-                    f"UPDATE {table} SET player_id = :keep_id WHERE player_id IN ({','.join(map(str, merge_ids))})"
-                )
-                session.execute(update_query, {"keep_id": keep_id})
-
     print(f"\n  {'Total records to migrate:':<30s} {total_records:4d}")
 
-    if not dry_run:
-        # Delete duplicate player records
-        for player_id in merge_ids:
-            session.execute(text("DELETE FROM players WHERE id = :id"), {"id": player_id})
+def merge_statements(dialect_name: str, merge_map: dict[int, int]) -> tuple[list[TextClause], dict]:
+    """
+    Build the statements that merge duplicate players into the players they duplicate.
+
+    Every group is covered at once: a single UPDATE per table re-points the
+    rows of all merged players (each mapped to its kept player), then one
+    DELETE removes the merged players. Nothing is executed here.
 
-        session.commit()
-        print(f"\n✓ Merge completed! Deleted {len(merge_ids)} duplicate player(s).")
+    Args:
+        dialect_name: Name of the database dialect the statements are for
+        merge_map: Dict of merged player ID -> player ID to keep
+
+    Returns:
+        Tuple of (statements in execution order, parameters they all share)
+    """
+    merge_ids = list(merge_map)
+
+    if dialect_name == "postgresql":
+        # Both id lists bind as arrays, so every statement has the same text
+        # whatever the number of groups and PostgreSQL reuses its plans
+        params = {"merge_ids": merge_ids, "keep_ids": list(merge_map.values())}
+        updates = [
+            text(
+                f"UPDATE {table} SET player_id = m.keep_id "
+                f"FROM unnest(CAST(:merge_ids AS integer[]), CAST(:keep_ids AS integer[])) "
+                f"AS m(merge_id, keep_id) "
+                f"WHERE {table}.player_id = m.merge_id"
+            )
+            for table in PLAYER_TABLES
+        ]
+        delete_query = text("DELETE FROM players WHERE id = ANY(:merge_ids)")
     else:
-        print(f"\n⚠ DRY RUN - No changes made. Use --confirm to apply changes.")
+        # No array type: expanding IN lists, and a CASE mapping each merged
+        # player to its kept player (all values still bound, not inlined)
+        params = {"merge_ids": merge_ids}
+        cases = []
+        for n, (merge_id, keep_id) in enumerate(merge_map.items()):
+            cases.append(f"WHEN :merge_{n} THEN :keep_{n}")
+            params[f"merge_{n}"] = merge_id
+            params[f"keep_{n}"] = keep_id
+        updates = [
+            text(
+                f"UPDATE {table} SET player_id = CASE player_id {' '.join(cases)} END "
+                f"WHERE player_id IN :merge_ids"
+            ).bindparams(bindparam("merge_ids", expanding=True))
+            for table in PLAYER_TABLES
+        ]
+        delete_query = text("DELETE FROM players WHERE id IN :merge_ids").bindparams(
+            bindparam("merge_ids", expanding=True)
+        )
+
+    # Duplicate player records go last, once nothing references them
+    return [*updates, delete_query], params
+
+def merge_players(session: Session, merge_map: dict[int, int]):
+    """
+    Merge duplicate players into the players they duplicate.
+
+    Runs merge_statements() in the session's current transaction; the caller
+    owns the transaction, so it commits once (or rolls back) for all groups.
+
+    Args:
+        session: Database session
+        merge_map: Dict of merged player ID -> player ID to keep
+    """
+    statements, params = merge_statements(session.get_bind().dialect.name, merge_map)
+    for statement in statements:
+        session.execute(statement, params)
 
 def main():
     """Interactive duplicate player merger."""
@@ -108,13 +190,15 @@ def main():
     if len(sys.argv) > 1 and sys.argv[1].replace(".", "").isdigit():
         threshold = float(sys.argv[1])
 
-    engine = create_engine(settings.database_url)
+    engine = get_engine()
 
     print("=" * 80)
     print(f"DUPLICATE PLAYER MERGER (Threshold: {threshold:.0%})")
     print("=" * 80)
 
-    with Session(engine) as session:
+    # The plan is read and applied in a single transaction, committed when
+    # the block exits (a dry run writes nothing)
+    with Session(engine) as session, session.begin():
         # Get all active players
         players = session.execute(
             select(models.Player)
@@ -131,31 +215,38 @@ def main():
 
         print(f"\nFound {len(duplicates)} groups of potential duplicates.\n")
 
-        merged_count = 0
+        counts = count_player_records(
+            session, [player.id for group in duplicates for player, _ in group[1:]]
+        )
+
+        merge_map = {}
         for group_num, group in enumerate(duplicates, 1):
             print(f"\n{'Group ' + str(group_num):-^80}")
 
-            for i, player in enumerate(group):
+            # Similarities are the scores find_duplicates matched on
+            for i, (player, similarity) in enumerate(group):
                 power_str = f"{player.current_power:,}" if player.current_power else "N/A"
                 furnace_str = f"FC{player.current_furnace}" if player.current_furnace else "N/A"
 
-                similarity = 100.0 if i == 0 else difflib.SequenceMatcher(
-                    None, group[0].name.lower(), player.name.lower()
-                ).ratio() * 100
-
                 marker = "→ KEEP" if i == 0 else "  merge"
-                print(f"  {marker} [{player.id:3d}] '{player.name:30s}' | Power: {power_str:>15s} | {furnace_str:5s} | {similarity:.1f}%")
+                print(f"  {marker} [{player.id:3d}] '{player.name:30s}' | Power: {power_str:>15s} | {furnace_str:5s} | {similarity:.1%}")
 
             # Auto-merge: keep first (usually shortest/cleanest name), merge others
-            keep_id = group[0].id
-            merge_ids = [p.id for p in group[1:]]
+            keep_id = group[0][0].id
+            merge_ids = [p.id for p, _ in group[1:]]
+
+            print_merge_plan(keep_id, merge_ids, counts)
+            if dry_run:
+                print(f"\n⚠ DRY RUN - No changes made. Use --confirm to apply changes.")
+            merge_map.update(dict.fromkeys(merge_ids, keep_id))
 
-            merge_players(session, keep_id, merge_ids, dry_run=dry_run)
-            merged_count += len(merge_ids)
+        if not dry_run:
+            merge_players(session, merge_map)
+            print(f"\n✓ Merge completed! Deleted {len(merge_map)} duplicate player(s).")
 
         print(f"\n{'Summary':-^80}")
         print(f"Duplicate groups processed: {len(duplicates)}")
-        print(f"Players merged: {merged_count}")
+        print(f"Players merged: {len(merge_map)}")
 
         if dry_run:
             print(f"\n⚠ This was a DRY RUN - no changes were made to the database.")
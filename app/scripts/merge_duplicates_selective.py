@@ -5,33 +5,39 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import difflib
-from sqlalchemy import create_engine, select, text
+from sqlalchemy import bindparam, select, text
 from sqlalchemy.orm import Session
 from observatory.db import models
-from observatory.settings import settings
+from observatory.db.player_matching import candidate_name_pairs, name_similarity
+from observatory.db.session import get_engine
 
 def find_duplicates(players, threshold=0.70):
     """Find potential duplicate players based on name similarity."""
     duplicates = []
     checked = set()
+    names = [player.name.lower() for player in players]
+    lengths = [len(name) for name in names]
+    candidates = candidate_name_pairs(names, threshold)
 
     for i, player1 in enumerate(players):
         if player1.id in checked:
             continue
 
         matches = [player1]
-        for player2 in players[i+1:]:
+        # Only later players sharing enough characters can reach the
+        # threshold; they come in the same order as a full scan would
+        for j in candidates.get(i, ()):
+            player2 = players[j]
             if player2.id in checked:
                 continue
 
-            similarity = difflib.SequenceMatcher(
-                None,
-                player1.name.lower(),
-                player2.name.lower()
-            ).ratio()
+            # The ratio 2*M / (len1 + len2) is at most 2*min / (len1 + len2),
+            # so lengths alone rule some pairs out before they are scored
+            total = lengths[i] + lengths[j]
+            if total and 2.0 * min(lengths[i], lengths[j]) / total < threshold:
+                continue
 
-            if similarity >= threshold:
+            if name_similarity(names[i], names[j]) >= threshold:
                 matches.append(player2)
                 checked.add(player2.id)
 
@@ -41,41 +47,107 @@ def find_duplicates(players, threshold=0.70):
 
     return duplicates
 
-def merge_players(session: Session, keep_id: int, merge_ids: list[int]):
-    """Merge duplicate players into one, handling duplicate history records."""
+def merge_players(session: Session, merge_map: dict[int, int]):
+    """
+    Merge duplicate players into one, handling duplicate history records.
+
+    All groups are applied together: each statement below covers every
+    merged player at once, so the round-trips no longer grow with the number
+    of groups. Ids are always bound, never formatted into the SQL.
+
+    Args:
+        session: Database session
+        merge_map: Dict of merged player ID -> player ID to keep
+    """
+    merge_ids = list(merge_map)
+
+    if session.get_bind().dialect.name == "postgresql":
+        # Id lists bind as arrays, so the statement text doesn't change with
+        # the number of players and PostgreSQL can reuse the plans
+        params = {"merge_ids": merge_ids, "keep_ids": list(merge_map.values())}
+        mapping = "unnest(CAST(:merge_ids AS integer[]), CAST(:keep_ids AS integer[]))"
+        move_history_sql = """
+            UPDATE {table} SET player_id = m.keep_id
+            FROM {mapping} AS m(merge_id, keep_id)
+            WHERE {table}.player_id = m.merge_id
+            AND NOT EXISTS (
+                SELECT 1 FROM {table} AS kept
+                WHERE kept.player_id = m.keep_id
+                AND kept.captured_at = {table}.captured_at
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM {table} AS other, {mapping} AS o(merge_id, keep_id)
+                WHERE other.player_id = o.merge_id
+                AND o.keep_id = m.keep_id
+                AND other.captured_at = {table}.captured_at
+                AND other.id < {table}.id
+            )
+        """
+        update_sql = (
+            "UPDATE {table} SET player_id = m.keep_id FROM {mapping} AS m(merge_id, keep_id) "
+            "WHERE {table}.player_id = m.merge_id"
+        )
+        delete_merged_sql = "DELETE FROM {table} WHERE player_id = ANY(:merge_ids)"
+        delete_sql = "DELETE FROM players WHERE id = ANY(:merge_ids)"
+
+        def statement(sql, table=None):
+            return text(sql.format(table=table, mapping=mapping))
+    else:
+        # Expanding IN lists, with a CASE mapping each merged player to the
+        # player it is merged into
+        params = {"merge_ids": merge_ids}
+        cases = []
+        for n, (merge_id, keep_id) in enumerate(merge_map.items()):
+            cases.append(f"WHEN :merge_{n} THEN :keep_{n}")
+            params[f"merge_{n}"] = merge_id
+            params[f"keep_{n}"] = keep_id
+        cases = " ".join(cases)
+        move_history_sql = """
+            UPDATE {table} SET player_id = CASE player_id {cases} END
+            WHERE player_id IN :merge_ids
+            AND NOT EXISTS (
+                SELECT 1 FROM {table} AS kept
+                WHERE kept.player_id = CASE {table}.player_id {cases} END
+                AND kept.captured_at = {table}.captured_at
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM {table} AS other
+                WHERE other.player_id IN :merge_ids
+                AND CASE other.player_id {cases} END = CASE {table}.player_id {cases} END
+                AND other.captured_at = {table}.captured_at
+                AND other.id < {table}.id
+            )
+        """
+        update_sql = "UPDATE {table} SET player_id = CASE player_id {cases} END WHERE player_id IN :merge_ids"
+        delete_merged_sql = "DELETE FROM {table} WHERE player_id IN :merge_ids"
+        delete_sql = "DELETE FROM players WHERE id IN :merge_ids"
+
+        def statement(sql, table=None):
+            return text(sql.format(table=table, cases=cases)).bindparams(
+                bindparam("merge_ids", expanding=True)
+            )
 
-    # For history tables with unique constraints, delete conflicting records first
-    # Unique constraints: (player_id, captured_at)
+    # History tables are unique on (player_id, captured_at): a merged player's
+    # record moves only if the kept player has none at that time and no other
+    # player merged into it has an earlier one; whatever is left is dropped
     for table in ["player_power_history", "player_furnace_history"]:
-        # Delete records from merge_ids that would conflict with keep_id
-        session.execute(text(f"""
-            DELETE FROM {table}
-            WHERE player_id IN ({','.join(map(str, merge_ids))})
-            AND captured_at IN (
-                SELECT captured_at FROM {table} WHERE player_id = :keep_id
-            )
-        """), {"keep_id": keep_id})
+        session.execute(statement(move_history_sql, table), params)
+        session.execute(statement(delete_merged_sql, table), params)
 
-    # Now update remaining records
+    # Now update the other tables
     tables = [
         "bear_scores",
         "foundry_results",
         "foundry_signups",
         "ac_signups",
         "contribution_snapshots",
-        "player_power_history",
-        "player_furnace_history",
     ]
 
     for table in tables:
-        update_query = text(
-            f"UPDATE {table} SET player_id = :keep_id WHERE player_id IN ({','.join(map(str, merge_ids))})"
-        )
-        session.execute(update_query, {"keep_id": keep_id})
+        session.execute(statement(update_sql, table), params)
 
     # Delete duplicate player records
-    for player_id in merge_ids:
-        session.execute(text("DELETE FROM players WHERE id = :id"), {"id": player_id})
+    session.execute(statement(delete_sql), params)
 
 def main():
     """Merge duplicates, skipping group 4 (Mar vs Marra - different players)."""
@@ -83,13 +155,15 @@ def main():
     # Groups to skip (1-indexed)
     skip_groups = [4]  # Mar vs Marra are different players
 
-    engine = create_engine(settings.database_url)
+    engine = get_engine()
 
     print("=" * 80)
     print("SELECTIVE DUPLICATE MERGER")
     print("=" * 80)
 
-    with Session(engine) as session:
+    # One transaction for the whole run: every merge commits together when
+    # the block exits, or none do
+    with Session(engine) as session, session.begin():
         players = session.execute(
             select(models.Player)
             .where(models.Player.alliance_id == 1)
@@ -102,7 +176,7 @@ def main():
         print(f"Skipping group(s): {', '.join(map(str, skip_groups))}")
         print()
 
-        merged_count = 0
+        merge_map = {}
         for group_num, group in enumerate(duplicates, 1):
             # Check if we should skip this group
             if group_num in skip_groups:
@@ -125,15 +199,15 @@ def main():
             keep_id = group[0].id
             merge_ids = [p.id for p in group[1:]]
 
-            merge_players(session, keep_id, merge_ids)
-            merged_count += len(merge_ids)
+            merge_map.update(dict.fromkeys(merge_ids, keep_id))
 
-        session.commit()
+        if merge_map:
+            merge_players(session, merge_map)
 
         print(f"\n{'Summary':-^80}")
         print(f"Groups processed: {len(duplicates) - len(skip_groups)}")
         print(f"Groups skipped: {len(skip_groups)}")
-        print(f"Players merged: {merged_count}")
+        print(f"Players merged: {len(merge_map)}")
         print(f"\n✓ Merge completed successfully!")
 
 if __name__ == "__main__":
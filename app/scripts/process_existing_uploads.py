@@ -1,15 +1,46 @@
-"""Process all existing uploaded screenshots."""
+"""Process all existing uploaded screenshots.
+
+Usage:
+    python scripts/process_existing_uploads.py [--workers N]
+
+Each screenshot spends most of its time waiting on the OCR API, so several
+are sent to OCR at once (AI_OCR_CONCURRENCY workers by default). The database
+writes stay on the main thread, one screenshot at a time. Use
+process_existing_uploads_slow.py for a serial, rate-limited run.
+"""
+import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from sqlalchemy import text
 from observatory.screenshot_processor import ScreenshotProcessor
-from observatory.db.session import SessionLocal
-
-
-def process_all_uploads():
+from observatory.db.processed_file_operations import (
+    file_sha256,
+    load_processed_digests,
+    record_processed_file,
+)
+from observatory.db.session import SessionLocal, engine
+from observatory.settings import settings
+
+
+def load_processed_names() -> frozenset[str]:
+    """Return the file names of screenshots recorded as SUCCEEDED in the database."""
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT source_path
+            FROM screenshots
+            WHERE status = 'SUCCEEDED'
+              AND source_path IS NOT NULL
+        """))
+        return frozenset(Path(source_path).name for source_path, in rows)
+
+
+def process_all_uploads(workers: int = 1):
     """Process all screenshots in /app/uploads directory."""
     upload_dir = Path("/app/uploads")
 
@@ -17,17 +48,48 @@ def process_all_uploads():
         print("No uploads directory found")
         return
 
-    screenshots = list(upload_dir.glob("*.jpg")) + list(upload_dir.glob("*.png"))
+    # One directory pass for both extensions
+    with os.scandir(upload_dir) as entries:
+        screenshots = [
+            Path(entry.path)
+            for entry in entries
+            if entry.is_file() and entry.name.lower().endswith((".jpg", ".png"))
+        ]
 
     if not screenshots:
         print("No screenshots found in uploads directory")
         return
 
-    print(f"Found {len(screenshots)} screenshots to process")
-    print("-" * 80)
+    # Screenshots already ingested are skipped here, before they cost an OCR
+    # API call only to be recognised as duplicates
+    processed = load_processed_names()
+    with SessionLocal() as session:
+        done_digests = load_processed_digests(session)
 
-    session = SessionLocal()
-    processor = ScreenshotProcessor(alliance_id=1)
+    # Checkpoints are by contents, so a file that was renamed, or copied
+    # in twice, is still only sent once
+    pending = []
+    queued_digests = set()
+    for screenshot in sorted(screenshots):
+        if screenshot.name in processed:
+            continue
+        digest = file_sha256(screenshot)
+        if digest in done_digests or digest in queued_digests:
+            continue
+        queued_digests.add(digest)
+        pending.append((screenshot, digest))
+
+    skipped = len(screenshots) - len(pending)
+    screenshots = pending
+
+    if skipped:
+        print(f"Skipping {skipped} already processed screenshot(s)")
+    if not screenshots:
+        print("No new screenshots to process")
+        return
+
+    print(f"Found {len(screenshots)} screenshots to process ({workers} worker(s))")
+    print("-" * 80)
 
     results = {
         "success": 0,
@@ -35,27 +97,41 @@ def process_all_uploads():
         "total_records": 0
     }
 
-    for screenshot in sorted(screenshots):
-        print(f"\nProcessing: {screenshot.name}")
-
-        try:
-            result = processor.process_screenshot(session, screenshot)
+    processor = ScreenshotProcessor(alliance_id=1)
 
-            if result["success"]:
-                results["success"] += 1
-                results["total_records"] += result["records_saved"]
-                print(f"  ✓ Type: {result['type']}")
-                print(f"  ✓ {result['message']}")
-            else:
+    # Only OCR runs in the pool. Players and events are found-or-created by
+    # select-then-insert, so concurrent writers would race each other; every
+    # write and checkpoint is made here, by this thread, in completion order
+    with ThreadPoolExecutor(max_workers=workers) as pool, SessionLocal() as session:
+        futures = {
+            pool.submit(processor.extract, screenshot): (screenshot, digest)
+            for screenshot, digest in screenshots
+        }
+
+        for future in as_completed(futures):
+            screenshot, digest = futures[future]
+            print(f"\nProcessing: {screenshot.name}")
+
+            try:
+                result = processor.save_extraction(session, future.result())
+
+                if result["success"]:
+                    record_processed_file(session, screenshot, digest, result)
+                    results["success"] += 1
+                    results["total_records"] += result["records_saved"]
+                    print(f"  ✓ Type: {result['type']}")
+                    print(f"  ✓ {result['message']}")
+                else:
+                    # Don't let a half-written screenshot block the next one
+                    session.rollback()
+                    results["failed"] += 1
+                    print(f"  ✗ Type: {result['type']}")
+                    print(f"  ✗ {result['message']}")
+
+            except Exception as e:
+                session.rollback()
                 results["failed"] += 1
-                print(f"  ✗ Type: {result['type']}")
-                print(f"  ✗ {result['message']}")
-
-        except Exception as e:
-            results["failed"] += 1
-            print(f"  ✗ Error: {e}")
-
-    session.close()
+                print(f"  ✗ Error: {e}")
 
     print("\n" + "=" * 80)
     print(f"Processing complete!")
@@ -66,4 +142,12 @@ def process_all_uploads():
 
 
 if __name__ == "__main__":
-    process_all_uploads()
+    parser = argparse.ArgumentParser(description="Process all existing uploaded screenshots")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.ai_ocr_concurrency,
+        help=f"Screenshots sent to OCR concurrently (default: {settings.ai_ocr_concurrency})",
+    )
+    args = parser.parse_args()
+    process_all_uploads(max(1, args.workers))
@@ -1,17 +1,113 @@
 """Process all existing uploaded screenshots with rate limiting."""
 import sys
 import time
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from observatory.screenshot_processor import ScreenshotProcessor
+from observatory.db.processed_file_operations import (
+    file_sha256,
+    load_processed_digests,
+    record_processed_file,
+)
 from observatory.db.session import SessionLocal
+from observatory.settings import settings
+
+# Wait after a rate limit error that doesn't say how long to back off
+DEFAULT_RETRY_AFTER = 60.0
+
+
+class RequestBucket:
+    """
+    Token bucket pacing requests to a requests-per-minute budget.
+
+    Tokens refill continuously, so time spent processing a screenshot counts
+    towards the wait for the next one: a request only sleeps for whatever is
+    left of its slot, rather than a fixed delay on top of the work.
+    """
+
+    def __init__(self, per_minute: int, burst: int = 1):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        self._refill()
+        if self.tokens < 1:
+            time.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Sleep for a server-requested back-off and start again with an empty bucket."""
+        time.sleep(seconds)
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+
+def _error_chain(exc):
+    """Yield exc and the exceptions it was raised from."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def is_rate_limited(exc: Exception | None) -> bool:
+    """Whether exc (or an error it wraps) is an HTTP 429 / rate limit error."""
+    for error in _error_chain(exc):
+        if getattr(error, "status_code", None) == 429 or "rate limit" in str(error).lower():
+            return True
+    return False
+
+
+def retry_after(exc: Exception, default: float = DEFAULT_RETRY_AFTER) -> float:
+    """
+    Seconds the API asked us to wait before retrying, from the error's response.
+
+    OpenAI's RateLimitError carries the HTTP response; its retry-after-ms or
+    Retry-After header (seconds or an HTTP date) is used when present.
+    """
+    for error in _error_chain(exc):
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            try:
+                return max(float(value) / 1000, 0.0)
+            except ValueError:
+                pass
+
+        value = headers.get("retry-after")
+        if value is None:
+            continue
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+
+    return default
 
 
 def process_all_uploads_with_delay():
-    """Process all screenshots in /app/uploads directory with delays to avoid rate limits."""
+    """Process all screenshots in /app/uploads directory, paced to avoid rate limits."""
     upload_dir = Path("/app/uploads")
 
     if not upload_dir.exists():
@@ -24,12 +120,17 @@ def process_all_uploads_with_delay():
         print("No screenshots found in uploads directory")
         return
 
+    rpm = settings.ai_ocr_requests_per_minute
     print(f"Found {len(screenshots)} screenshots to process")
-    print("Processing with 3-second delays to avoid rate limits...")
+    print(f"Processing at up to {rpm} requests per minute to avoid rate limits...")
     print("-" * 80)
 
     session = SessionLocal()
     processor = ScreenshotProcessor(alliance_id=1)
+    bucket = RequestBucket(rpm)
+    # Files whose contents were already processed, by a previous run or
+    # earlier in this one
+    done_digests = set(load_processed_digests(session))
 
     results = {
         "success": 0,
@@ -41,10 +142,28 @@ def process_all_uploads_with_delay():
     for i, screenshot in enumerate(sorted(screenshots), 1):
         print(f"\n[{i}/{len(screenshots)}] Processing: {screenshot.name}")
 
+        digest = file_sha256(screenshot)
+        if digest in done_digests:
+            results["skipped"] += 1
+            print(f"  ⊘ Already processed (checkpoint), skipping")
+            continue
+
         try:
+            bucket.acquire()
             result = processor.process_screenshot(session, screenshot)
 
+            # The processor reports failures in the result, keeping the error
+            if not result["success"] and is_rate_limited(result.get("error")):
+                wait = retry_after(result["error"])
+                print(f"  ⏸ Rate limit hit, waiting {wait:.0f} seconds...")
+                bucket.pause(wait)
+                # Retry this screenshot once
+                bucket.acquire()
+                result = processor.process_screenshot(session, screenshot)
+
             if result["success"]:
+                record_processed_file(session, screenshot, digest, result)
+                done_digests.add(digest)
                 results["success"] += 1
                 results["total_records"] += result["records_saved"]
                 print(f"  ✓ Type: {result['type']}")
@@ -60,29 +179,8 @@ def process_all_uploads_with_delay():
                     print(f"  ✗ {result['message']}")
 
         except Exception as e:
-            if "rate limit" in str(e).lower():
-                print(f"  ⏸ Rate limit hit, waiting 60 seconds...")
-                time.sleep(60)
-                # Retry this screenshot
-                try:
-                    result = processor.process_screenshot(session, screenshot)
-                    if result["success"]:
-                        results["success"] += 1
-                        results["total_records"] += result["records_saved"]
-                        print(f"  ✓ Retry successful: {result['message']}")
-                    else:
-                        results["failed"] += 1
-                        print(f"  ✗ Retry failed: {result['message']}")
-                except Exception as retry_error:
-                    results["failed"] += 1
-                    print(f"  ✗ Retry error: {retry_error}")
-            else:
-                results["failed"] += 1
-                print(f"  ✗ Error: {e}")
-
-        # Add delay between screenshots to avoid rate limits
-        if i < len(screenshots):
-            time.sleep(3)
+            results["failed"] += 1
+            print(f"  ✗ Error: {e}")
 
     session.close()
 
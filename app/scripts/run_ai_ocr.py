@@ -6,7 +6,7 @@ import argparse
 import json
 from pathlib import Path
 
-from observatory.ocr.ai_client import OpenAIVisionExtractor
+from observatory.ocr.ai_client import get_extractor
 
 
 def main() -> None:
@@ -14,7 +14,7 @@ def main() -> None:
     parser.add_argument("image", type=Path, help="Path to screenshot image")
     args = parser.parse_args()
 
-    extractor = OpenAIVisionExtractor()
+    extractor = get_extractor()
     players = extractor.extract_players(args.image)
     print(json.dumps({"players": players}, indent=2, ensure_ascii=False))
 
@@ -11,12 +11,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import pytz
-from sqlalchemy import select
+from sqlalchemy import desc, func, select
 
 from observatory.db import models
 from observatory.db.ac_operations import save_ac_signup_ocr
 from observatory.db.session import SessionLocal
-from observatory.ocr.ai_client import OpenAIVisionExtractor
+from observatory.ocr.ai_client import get_extractor
 from observatory.ocr.timestamp_extractor import extract_timestamp
 from observatory.settings import settings
 
@@ -57,7 +57,7 @@ def main() -> None:
 
     # Run AI OCR
     print("Running AI OCR extraction...")
-    extractor = OpenAIVisionExtractor(model=settings.ai_ocr_model)
+    extractor = get_extractor(settings.ai_ocr_model)
     try:
         signup_data = extractor.extract_ac_signup(args.image)
     except Exception as exc:
@@ -85,20 +85,30 @@ def main() -> None:
         # Query back to verify
         stmt = select(models.ACEvent).where(models.ACEvent.id == result['event_id'])
         event = session.execute(stmt).scalar_one()
+        signup_count = session.execute(
+            select(func.count()).where(models.ACSignup.ac_event_id == event.id)
+        ).scalar_one()
         print(f"\nAC Event Details:")
         print(f"  ID: {event.id}")
         print(f"  Alliance: {event.alliance_id}")
         print(f"  Week Start: {event.week_start_date.date()}")
         print(f"  Total Registered: {event.total_registered}")
         print(f"  Total Power: {event.total_power:,}" if event.total_power else "  Total Power: None")
-        print(f"  Signups Recorded: {len(event.signups)}")
+        print(f"  Signups Recorded: {signup_count}")
 
-        # Show a few signups
-        if event.signups:
+        # Show a few signups: the database sorts and limits, and each signup
+        # comes back joined to its player
+        if signup_count:
             print(f"\nSample signups (top 5 by power):")
-            sorted_signups = sorted(event.signups, key=lambda s: s.ac_power, reverse=True)
-            for signup in sorted_signups[:5]:
-                print(f"  - {signup.player.name}: {signup.ac_power:,}")
+            top_stmt = (
+                select(models.ACSignup, models.Player)
+                .join(models.Player, models.Player.id == models.ACSignup.player_id)
+                .where(models.ACSignup.ac_event_id == event.id)
+                .order_by(desc(models.ACSignup.ac_power))
+                .limit(5)
+            )
+            for signup, player in session.execute(top_stmt).all():
+                print(f"  - {player.name}: {signup.ac_power:,}")
 
     finally:
         session.close()
@@ -11,7 +11,7 @@ import pytz
 
 from observatory.db.bear_operations import save_bear_event_ocr
 from observatory.db.session import SessionLocal
-from observatory.ocr.ai_client import OpenAIVisionExtractor
+from observatory.ocr.ai_client import get_extractor
 from observatory.ocr.timestamp_extractor import extract_timestamp
 from observatory.settings import settings
 
@@ -53,7 +53,7 @@ def main() -> None:
 
     # Run AI OCR
     print("Running AI OCR...")
-    extractor = OpenAIVisionExtractor(model=settings.ai_ocr_model)
+    extractor = get_extractor(settings.ai_ocr_model)
     bear_data = extractor.extract_bear_event(args.image)
 
     trap_id = bear_data.get("trap_id")
@@ -86,7 +86,7 @@ def main() -> None:
     # Query back to verify
     print("Querying bear event for verification...")
     with SessionLocal() as session:
-        from observatory.db.models import BearEvent, BearScore
+        from observatory.db.models import BearEvent, BearScore, Player
         from sqlalchemy import select, desc
 
         stmt = select(BearEvent).where(BearEvent.id == result['event_id'])
@@ -94,18 +94,18 @@ def main() -> None:
 
         print(f"  Event: Trap {event.trap_id} started at {event.started_at}")
 
+        # Players come back joined to their scores, not one SELECT per score
         scores_stmt = (
-            select(BearScore)
+            select(BearScore, Player)
+            .join(Player, Player.id == BearScore.player_id)
             .where(BearScore.bear_event_id == event.id)
             .order_by(desc(BearScore.score))
             .limit(10)
         )
-        scores = session.execute(scores_stmt).scalars().all()
+        scores = session.execute(scores_stmt).all()
 
         print(f"  Top {len(scores)} scores:")
-        for score in scores:
-            from observatory.db.models import Player
-            player = session.execute(select(Player).where(Player.id == score.player_id)).scalar_one()
+        for score, player in scores:
             rank_str = f"#{score.rank}" if score.rank else "Unranked"
             print(f"    {rank_str:10s} {player.name:30s} {score.score:,}")
 
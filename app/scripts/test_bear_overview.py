@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import argparse
 import logging
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -11,18 +12,27 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import pytesseract
 from PIL import Image
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from observatory.db import models
 from observatory.db.bear_operations import find_or_create_bear_event
 from observatory.db.session import SessionLocal
-from observatory.ocr.bear_overview_parser import parse_bear_overview
+from observatory.ocr.bear_overview_parser import (
+    OVERVIEW_MAX_SIDE,
+    OVERVIEW_PSM,
+    OVERVIEW_WHITELIST,
+    overview_region,
+    parse_bear_overview,
+)
+from observatory.ocr.text_extractor import image_to_text
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Completion time shown on the overview, e.g. "2025-11-11 22:30:05"
+TIMESTAMP_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})\s+(\d{2}):(\d{2}):(\d{2})")
+
 
 def parse_event_time(time_str: str) -> datetime:
     """Parse event time string to datetime (UTC)."""
@@ -69,16 +79,24 @@ def main():
 
     logger.info(f"Loading screenshot: {screenshot_path}")
     image = Image.open(screenshot_path)
+    image.thumbnail((OVERVIEW_MAX_SIDE, OVERVIEW_MAX_SIDE), Image.Resampling.LANCZOS)
 
-    # Extract text with Tesseract
+    # Extract text with Tesseract, from the overview band only
     logger.info("Running Tesseract OCR...")
-    text = pytesseract.image_to_string(image)
+    text = image_to_text(overview_region(image), psm=OVERVIEW_PSM, whitelist=OVERVIEW_WHITELIST)
     logger.debug(f"OCR text:\n{text}")
 
     # Parse overview data
     logger.info("Parsing battle overview data...")
     overview_data = parse_bear_overview(text)
 
+    if overview_data.get("trap_id") is None or not TIMESTAMP_PATTERN.search(text):
+        # Unexpected layout or resolution: read the whole screenshot instead
+        logger.info("Overview band incomplete, running Tesseract on the full screenshot...")
+        text = image_to_text(image)
+        logger.debug(f"OCR text:\n{text}")
+        overview_data = parse_bear_overview(text)
+
     trap_id = overview_data.get("trap_id")
     rally_count = overview_data.get("rally_count")
     total_damage = overview_data.get("total_damage")
@@ -87,17 +105,21 @@ def main():
         logger.error("Failed to extract trap ID from overview")
         return
 
-    logger.info(f"Extracted data:")
-    logger.info(f"  Trap ID: {trap_id}")
-    logger.info(f"  Rally Count: {rally_count}")
-    logger.info(f"  Total Damage: {total_damage:,}" if total_damage else "  Total Damage: None")
+    lines = [
+        "Extracted data:",
+        f"  Trap ID: {trap_id}",
+        f"  Rally Count: {rally_count}",
+    ]
+    if total_damage:
+        lines.append(f"  Total Damage: {total_damage:,}")
+    else:
+        lines.append("  Total Damage: None")
+    logger.info("\n".join(lines))
 
     # Extract event completion timestamp from image
     # The screenshot shows "2025-11-11 22:30:05" which is the ended_at time
     # We'll try to extract this from OCR text
-    import re
-    timestamp_pattern = r"(\d{4})-(\d{2})-(\d{2})\s+(\d{2}):(\d{2}):(\d{2})"
-    timestamp_match = re.search(timestamp_pattern, text)
+    timestamp_match = TIMESTAMP_PATTERN.search(text)
     ended_at = None
     if timestamp_match:
         year, month, day, hour, minute, second = map(int, timestamp_match.groups())
@@ -120,20 +142,25 @@ def main():
         )
         session.commit()
 
-        logger.info(f"✓ Updated bear event ID: {bear_event.id}")
-        logger.info(f"  Alliance ID: {bear_event.alliance_id}")
-        logger.info(f"  Trap: {bear_event.trap_id}")
-        logger.info(f"  Started: {bear_event.started_at}")
-        logger.info(f"  Ended: {bear_event.ended_at}")
-        logger.info(f"  Rallies: {bear_event.rally_count}")
-        logger.info(f"  Total Damage: {bear_event.total_damage:,}" if bear_event.total_damage else "  Total Damage: None")
-
-        # Query scores for this event
-        stmt = select(models.BearScore).where(
+        lines = [
+            f"✓ Updated bear event ID: {bear_event.id}",
+            f"  Alliance ID: {bear_event.alliance_id}",
+            f"  Trap: {bear_event.trap_id}",
+            f"  Started: {bear_event.started_at}",
+            f"  Ended: {bear_event.ended_at}",
+            f"  Rallies: {bear_event.rally_count}",
+        ]
+        if bear_event.total_damage:
+            lines.append(f"  Total Damage: {bear_event.total_damage:,}")
+        else:
+            lines.append("  Total Damage: None")
+
+        # Count scores for this event
+        stmt = select(func.count()).select_from(models.BearScore).where(
             models.BearScore.bear_event_id == bear_event.id
         )
-        scores = session.execute(stmt).scalars().all()
-        logger.info(f"  Player Scores: {len(scores)}")
+        lines.append(f"  Player Scores: {session.execute(stmt).scalar_one()}")
+        logger.info("\n".join(lines))
     finally:
         session.close()
 
@@ -6,9 +6,16 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import pytesseract
 from PIL import Image
-from observatory.ocr.bear_overview_parser import parse_bear_overview
+from observatory.ocr.bear_overview_parser import (
+    OVERVIEW_MAX_SIDE,
+    OVERVIEW_PSM,
+    OVERVIEW_WHITELIST,
+    looks_like_overview,
+    overview_region,
+    parse_bear_overview,
+)
+from observatory.ocr.text_extractor import image_to_text
 
 # Test file
 test_file = Path("Screenshot_20251117_191833_Whiteout Survival.jpg")
@@ -25,7 +32,8 @@ print("=" * 60)
 # Extract text using Tesseract
 print("\n1. Extracting text with Tesseract...")
 image = Image.open(test_file)
-text = pytesseract.image_to_string(image)
+image.thumbnail((OVERVIEW_MAX_SIDE, OVERVIEW_MAX_SIDE), Image.Resampling.LANCZOS)
+text = image_to_text(overview_region(image), psm=OVERVIEW_PSM, whitelist=OVERVIEW_WHITELIST)
 
 print("\nExtracted text:")
 print("-" * 60)
@@ -36,6 +44,17 @@ print("-" * 60)
 print("\n2. Parsing extracted data...")
 data = parse_bear_overview(text)
 
+if not data.get("trap_id"):
+    if not looks_like_overview(text):
+        # None of the overview's labels in the band: a different screen, so
+        # skip the full-screenshot pass
+        print("\n✗ Not a bear overview screenshot (no overview labels found)")
+        sys.exit(1)
+    # The band didn't hold the whole overview: fall back to the full screenshot
+    print("\n   Overview band incomplete, retrying on the full screenshot...")
+    text = image_to_text(image)
+    data = parse_bear_overview(text)
+
 print("\nParsed results:")
 print(f"  trap_id: {data.get('trap_id')}")
 print(f"  rally_count: {data.get('rally_count')}")
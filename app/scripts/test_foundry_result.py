@@ -5,18 +5,18 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-from datetime import datetime
+from datetime import date, datetime, time, timezone
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-import pytz
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
 from observatory.db import models
 from observatory.db.foundry_operations import save_foundry_result_ocr
 from observatory.db.session import SessionLocal
-from observatory.ocr.ai_client import OpenAIVisionExtractor
+from observatory.ocr.ai_client import get_extractor
 from observatory.ocr.timestamp_extractor import extract_timestamp
 from observatory.settings import settings
 
@@ -46,28 +46,34 @@ def main() -> None:
     print(f"Event date: {args.event_date} UTC")
     print()
 
-    # Parse event date
+    # Parse event date: a plain YYYY-MM-DD, taken as midnight UTC
     try:
-        event_date = datetime.strptime(args.event_date, "%Y-%m-%d")
-        event_date = pytz.UTC.localize(event_date)
+        event_date = datetime.combine(date.fromisoformat(args.event_date), time(), tzinfo=timezone.utc)
     except ValueError as exc:
         print(f"Error parsing event date: {exc}")
         print("Format should be: YYYY-MM-DD (e.g., 2025-11-01)")
         return
 
+    # Read the screenshot once; the timestamp and OCR steps share the bytes
+    try:
+        image_data = args.image.read_bytes()
+    except OSError as exc:
+        print(f"Error reading screenshot: {exc}")
+        return
+
     # Extract screenshot timestamp
-    screenshot_recorded_at = extract_timestamp(args.image)
+    screenshot_recorded_at = extract_timestamp(args.image, image_data)
     if screenshot_recorded_at:
         print(f"Screenshot timestamp: {screenshot_recorded_at}")
     else:
         print("WARNING: Could not extract screenshot timestamp, using current time")
-        screenshot_recorded_at = pytz.UTC.localize(datetime.utcnow())
+        screenshot_recorded_at = datetime.now(timezone.utc)
 
     # Run AI OCR
     print("Running AI OCR extraction...")
-    extractor = OpenAIVisionExtractor(model=settings.ai_ocr_model)
+    extractor = get_extractor(settings.ai_ocr_model)
     try:
-        result_data = extractor.extract_foundry_result(args.image)
+        result_data = extractor.extract_foundry_result(args.image, image_data)
     except Exception as exc:
         print(f"ERROR: AI OCR failed: {exc}")
         return
@@ -92,8 +98,13 @@ def main() -> None:
         )
         print(f"✓ Saved {result['results']} results to foundry event ID {result['event_id']}")
 
-        # Query back to verify
-        stmt = select(models.FoundryEvent).where(models.FoundryEvent.id == result['event_id'])
+        # Query back to verify; results and their players are loaded up front
+        # for the top 5 listing below
+        stmt = select(models.FoundryEvent).where(
+            models.FoundryEvent.id == result['event_id']
+        ).options(
+            selectinload(models.FoundryEvent.results).selectinload(models.FoundryResult.player)
+        )
         event = session.execute(stmt).scalar_one()
         print(f"\nFoundry Event Details:")
         print(f"  ID: {event.id}")
@@ -105,10 +116,13 @@ def main() -> None:
 
         # Show top 5 results
         if event.results:
-            print(f"\nTop 5 results:")
             sorted_results = sorted(event.results, key=lambda r: r.rank if r.rank else 999)
-            for result_entry in sorted_results[:5]:
-                print(f"  #{result_entry.rank}: {result_entry.player.name} - {result_entry.score:,}")
+            lines = ["\nTop 5 results:"]
+            lines.extend(
+                f"  #{result_entry.rank}: {result_entry.player.name} - {result_entry.score:,}"
+                for result_entry in sorted_results[:5]
+            )
+            print("\n".join(lines))
 
     finally:
         session.close()
@@ -4,61 +4,85 @@ from __future__ import annotations
 
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+import pytz
+
 from observatory.db.operations import save_alliance_members_ocr
 from observatory.db.session import SessionLocal
-from observatory.ocr.ai_client import OpenAIVisionExtractor
+from observatory.ocr.ai_client import get_extractor
 from observatory.ocr.timestamp_extractor import extract_timestamp
 from observatory.settings import settings
 
 
+def expand_images(paths: list[Path]) -> list[Path]:
+    """Expand directories to the screenshots they contain, sorted by name."""
+    images = []
+    for path in paths:
+        if path.is_dir():
+            images.extend(
+                sorted(p for p in path.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+            )
+        else:
+            images.append(path)
+    return images
+
+
+def ocr_one(image: Path) -> tuple[datetime, list[dict]]:
+    """Extract the timestamp and players of one screenshot (no database access)."""
+    data = image.read_bytes()
+    captured_at = extract_timestamp(image, data)
+    if not captured_at:
+        print(f"WARNING: Could not extract timestamp from {image.name}, using current time")
+        captured_at = datetime.now(pytz.UTC)
+    players = get_extractor(settings.ai_ocr_model).extract_players(image, data)
+    return captured_at, players
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Test OCR pipeline with database persistence")
-    parser.add_argument("image", type=Path, help="Path to screenshot image")
+    parser.add_argument("images", type=Path, nargs="+", help="Screenshot images or directories of them")
     parser.add_argument("--alliance-id", type=int, default=1, help="Alliance ID (default: 1)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.ai_ocr_concurrency,
+        help=f"Screenshots sent to OCR concurrently (default: {settings.ai_ocr_concurrency})",
+    )
     args = parser.parse_args()
 
-    print(f"Processing: {args.image}")
+    images = expand_images(args.images)
+
+    print(f"Processing: {len(images)} screenshot(s)")
     print(f"AI OCR enabled: {settings.ai_ocr_enabled}")
     print(f"Model: {settings.ai_ocr_model}")
     print(f"Timezone: {settings.screenshot_timezone}")
     print()
 
-    # Extract timestamp from screenshot
-    captured_at = extract_timestamp(args.image)
-    if captured_at:
-        print(f"Screenshot timestamp: {captured_at} UTC")
-    else:
-        print("WARNING: Could not extract timestamp, using current time")
-        from datetime import datetime
-        import pytz
-        captured_at = datetime.now(pytz.UTC)
-    print()
-
-    # Run AI OCR
+    # Run AI OCR: each screenshot waits on the API, so they are extracted
+    # concurrently; map() hands the results back in input order
     print("Running AI OCR...")
-    extractor = OpenAIVisionExtractor(model=settings.ai_ocr_model)
-    players = extractor.extract_players(args.image)
-    print(f"Extracted {len(players)} players")
-    print()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        extracted = list(pool.map(ocr_one, images))
 
-    # Display extracted data
-    print("Extracted players:")
-    print(json.dumps(players, indent=2, ensure_ascii=False))
-    print()
-
-    # Save to database
-    print(f"Saving to database (alliance_id={args.alliance_id})...")
+    # Database writes stay on this thread, one session for the whole run
     with SessionLocal() as session:
-        result = save_alliance_members_ocr(
-            session=session,
-            alliance_id=args.alliance_id,
-            players_data=players,
-            captured_at=captured_at,
-        )
-
-    print(f"✓ Saved: {result['players']} players, {result['power_records']} power records, {result['furnace_records']} furnace records")
+        for image, (captured_at, players) in zip(images, extracted):
+            print(f"\n{image.name}")
+            print(f"Screenshot timestamp: {captured_at} UTC")
+            print(f"Extracted {len(players)} players")
+            print(json.dumps(players, indent=2, ensure_ascii=False))
+
+            print(f"Saving to database (alliance_id={args.alliance_id})...")
+            result = save_alliance_members_ocr(
+                session=session,
+                alliance_id=args.alliance_id,
+                players_data=players,
+                captured_at=captured_at,
+            )
+            print(f"✓ Saved: {result['players']} players, {result['power_records']} power records, {result['furnace_records']} furnace records")
     print()
 
     # Query back to verify
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import time
 from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from operator import attrgetter
 from pathlib import Path
 
 from fastapi import Depends, FastAPI, Form, HTTPException, Request, UploadFile, status
@@ -10,8 +12,8 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, text
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.orm import Session, selectinload
 
 from . import auth
 from .db import models
@@ -834,35 +836,32 @@ async def get_contribution_snapshots(
     """
     alliance_id = current_user.default_alliance_id or 1
 
-    # Get unique weeks
-    stmt = select(models.ContributionSnapshot.week_start_date).where(
+    # Latest snapshot_date of each week, joined back to its snapshots so the
+    # whole listing comes back in one query instead of two per week
+    latest = select(
+        models.ContributionSnapshot.week_start_date,
+        func.max(models.ContributionSnapshot.snapshot_date).label("snapshot_date")
+    ).where(
         models.ContributionSnapshot.alliance_id == alliance_id
-    ).distinct().order_by(models.ContributionSnapshot.week_start_date.desc())
+    ).group_by(models.ContributionSnapshot.week_start_date).subquery()
 
-    weeks = session.execute(stmt).scalars().all()
-
-    result_weeks = []
-    for w in weeks:
-        # Find the most recent snapshot_date for this week
-        latest_date_stmt = select(models.ContributionSnapshot.snapshot_date).where(
-            models.ContributionSnapshot.alliance_id == alliance_id,
-            models.ContributionSnapshot.week_start_date == w
-        ).order_by(models.ContributionSnapshot.snapshot_date.desc()).limit(1)
-
-        latest_date = session.execute(latest_date_stmt).scalar_one_or_none()
-
-        if not latest_date:
-            continue
-
-        # Get all snapshots from the latest date only
-        snapshots_stmt = select(models.ContributionSnapshot).where(
-            models.ContributionSnapshot.alliance_id == alliance_id,
-            models.ContributionSnapshot.week_start_date == w,
-            models.ContributionSnapshot.snapshot_date == latest_date
-        ).order_by(models.ContributionSnapshot.rank)
+    stmt = select(models.ContributionSnapshot).join(
+        latest,
+        and_(
+            models.ContributionSnapshot.week_start_date == latest.c.week_start_date,
+            models.ContributionSnapshot.snapshot_date == latest.c.snapshot_date
+        )
+    ).where(
+        models.ContributionSnapshot.alliance_id == alliance_id
+    ).order_by(
+        models.ContributionSnapshot.week_start_date.desc(),
+        models.ContributionSnapshot.rank
+    ).options(selectinload(models.ContributionSnapshot.player))
 
-        snapshots = session.execute(snapshots_stmt).scalars().all()
+    snapshots = session.execute(stmt).scalars().all()
 
+    result_weeks = []
+    for w, week_snapshots in groupby(snapshots, key=attrgetter("week_start_date")):
         result_weeks.append({
             "week_start": to_iso_string(w),
             "snapshots": [
@@ -872,7 +871,7 @@ async def get_contribution_snapshots(
                     "contribution": s.contribution_amount,
                     "rank": s.rank
                 }
-                for s in snapshots
+                for s in week_snapshots
             ]
         })
 
@@ -1,9 +1,39 @@
 """Custom SQLAlchemy types for proper timezone handling in SQLite."""
 from __future__ import annotations
 
-from datetime import datetime
-from sqlalchemy import TypeDecorator, DateTime, String
-import pytz
+from datetime import datetime, timezone
+from sqlalchemy import TypeDecorator, DateTime, JSON, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# JSON stored as text on SQLite; on PostgreSQL use JSONB so payloads are kept
+# pre-parsed in binary form instead of being reparsed on every read
+JSONPayload = JSON().with_variant(JSONB(), "postgresql")
+
+
+def sqlite_utc_text(column: str) -> str:
+    """
+    SQLite expression rewriting a datetime column as the text TZDateTime writes.
+
+    strftime() converts any offset to UTC, but its %f keeps only milliseconds,
+    so the seconds come from strftime() and the fractional digits are copied
+    from the stored text (offsets are whole minutes, so they never change)
+    and padded to six. Values SQLite can't parse give NULL.
+    """
+    tail = f"substr({column}, 20)"
+    offset = (
+        f"(CASE WHEN {tail} LIKE '%Z' THEN 'Z' "
+        f"WHEN substr({tail}, -6, 1) IN ('+', '-') AND substr({tail}, -3, 1) = ':' "
+        f"THEN substr({tail}, -6) ELSE '' END)"
+    )
+    fraction = (
+        f"(CASE WHEN substr({tail}, 1, 1) = '.' "
+        f"THEN substr({tail}, 2, length({tail}) - 1 - length({offset})) ELSE '' END)"
+    )
+    return (
+        f"(strftime('%Y-%m-%dT%H:%M:%S', substr({column}, 1, 19) || {offset}) "
+        f"|| '.' || substr({fraction} || '000000', 1, 6) || 'Z')"
+    )
 
 
 class TZDateTime(TypeDecorator):
@@ -11,8 +41,9 @@ class TZDateTime(TypeDecorator):
     DateTime type that ensures timezone info is preserved in SQLite.
 
     SQLite stores datetimes as text, and SQLAlchemy's DateTime(timezone=True)
-    doesn't always preserve the timezone suffix. This custom type ensures
-    all datetimes are stored with explicit timezone info (+00:00 for UTC).
+    doesn't always preserve the timezone suffix. This custom type stores every
+    datetime as fixed-width UTC ISO-8601 text (``YYYY-MM-DDTHH:MM:SS.ffffffZ``),
+    so string comparisons and indexes order values chronologically.
     """
     impl = DateTime
     cache_ok = True
@@ -27,24 +58,22 @@ class TZDateTime(TypeDecorator):
     def process_bind_param(self, value, dialect):
         """Convert Python datetime to database value."""
         if value is not None:
-            # For SQLite, convert to ISO format string (SQLite stores as text)
+            # Ensure timezone-aware (naive values are assumed to be UTC)
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            # For SQLite, convert to sortable UTC text (SQLite stores as text)
             if dialect.name == 'sqlite':
-                # Ensure timezone-aware before converting to ISO string
-                if value.tzinfo is None:
-                    value = pytz.UTC.localize(value)
-                return value.isoformat()
-            # For other databases, ensure timezone-aware
-            elif value.tzinfo is None:
-                value = pytz.UTC.localize(value)
+                value = value.astimezone(timezone.utc)
+                return f"{value:%Y-%m-%dT%H:%M:%S.%f}Z"
         return value
 
     def process_result_value(self, value, dialect):
         """Convert database value to Python datetime."""
         if value is not None and isinstance(value, str):
-            # Parse ISO format string; ensure trailing Z converted to explicit offset
-            normalized = value.replace('Z', '+00:00')
-            dt = datetime.fromisoformat(normalized)
+            # fromisoformat() accepts the trailing Z as well as older +HH:MM
+            # and space-separated server-default values
+            dt = datetime.fromisoformat(value)
             if dt.tzinfo is None:
-                return pytz.UTC.localize(dt)
+                return dt.replace(tzinfo=timezone.utc)
             return dt
         return value
@@ -1,4 +1,8 @@
-"""Shared enumeration types for persistence layer."""
+"""Shared enumeration types for persistence layer.
+
+The ORM stores these by member name in plain VARCHAR columns
+(``native_enum=False``), so adding a member needs no ``ALTER TYPE``.
+"""
 from __future__ import annotations
 
 from enum import Enum
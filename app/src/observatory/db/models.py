@@ -4,12 +4,12 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import Boolean, DateTime, Enum as SAEnum, ForeignKey, Integer, JSON, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, Enum as SAEnum, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from .base import Base
-from .custom_types import TZDateTime
+from .custom_types import JSONPayload, TZDateTime
 from .enums import EventStatType, PlayerStatus, ScreenshotStatus, ScreenshotType
 
 
@@ -22,7 +22,7 @@ class User(Base):
     password_hash: Mapped[str] = mapped_column(String(256))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
-    default_alliance_id: Mapped[int | None] = mapped_column(ForeignKey("alliances.id"), nullable=True)
+    default_alliance_id: Mapped[int | None] = mapped_column(ForeignKey("alliances.id"), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(TZDateTime, server_default=func.now())
     last_login: Mapped[datetime | None] = mapped_column(TZDateTime, nullable=True)
 
@@ -53,7 +53,7 @@ class Player(Base):
     alliance_id: Mapped[int] = mapped_column(ForeignKey("alliances.id", ondelete="CASCADE"), index=True)
     name: Mapped[str] = mapped_column(String(128))
     display_name: Mapped[str | None] = mapped_column(String(128), nullable=True)
-    status: Mapped[PlayerStatus] = mapped_column(SAEnum(PlayerStatus, name="player_status"), default=PlayerStatus.ACTIVE)
+    status: Mapped[PlayerStatus] = mapped_column(SAEnum(PlayerStatus, name="player_status", native_enum=False), default=PlayerStatus.ACTIVE)
     current_power: Mapped[int | None] = mapped_column(Integer, nullable=True)
     current_furnace: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(TZDateTime, server_default=func.now())
@@ -67,12 +67,21 @@ class Player(Base):
 
 class Screenshot(Base):
     __tablename__ = "screenshots"
+    __table_args__ = (
+        Index(
+            "ix_screenshots_status_active",
+            "status",
+            "created_at",
+            sqlite_where=text("status = 'PENDING' OR status = 'PROCESSING' OR status = 'FAILED'"),
+            postgresql_where=text("status = 'PENDING' OR status = 'PROCESSING' OR status = 'FAILED'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    alliance_id: Mapped[int] = mapped_column(ForeignKey("alliances.id", ondelete="CASCADE"), nullable=False)
+    alliance_id: Mapped[int] = mapped_column(ForeignKey("alliances.id", ondelete="CASCADE"), nullable=False, index=True)
     uploader: Mapped[str | None] = mapped_column(String(64), nullable=True)
-    detected_type: Mapped[ScreenshotType] = mapped_column(SAEnum(ScreenshotType, name="screenshot_type"), default=ScreenshotType.UNKNOWN)
-    status: Mapped[ScreenshotStatus] = mapped_column(SAEnum(ScreenshotStatus, name="screenshot_status"), default=ScreenshotStatus.PENDING, index=True)
+    detected_type: Mapped[ScreenshotType] = mapped_column(SAEnum(ScreenshotType, name="screenshot_type", native_enum=False), default=ScreenshotType.UNKNOWN)
+    status: Mapped[ScreenshotStatus] = mapped_column(SAEnum(ScreenshotStatus, name="screenshot_status", native_enum=False), default=ScreenshotStatus.PENDING)
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
     source_path: Mapped[str | None] = mapped_column(String(256), nullable=True)
     processed_at: Mapped[datetime | None] = mapped_column(TZDateTime, nullable=True)
@@ -84,10 +93,13 @@ class Screenshot(Base):
 
 class PlayerPowerHistory(Base):
     __tablename__ = "player_power_history"
-    __table_args__ = (UniqueConstraint("player_id", "captured_at", name="uq_power_capture"),)
+    __table_args__ = (
+        UniqueConstraint("player_id", "captured_at", name="uq_power_capture"),
+        Index("idx_power_history_player_time", "player_id", "captured_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), index=True)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"))
     power: Mapped[int] = mapped_column(Integer)
     captured_at: Mapped[datetime] = mapped_column(TZDateTime, index=True)
     created_at: Mapped[datetime] = mapped_column(TZDateTime, server_default=func.now())
@@ -97,10 +109,13 @@ class PlayerPowerHistory(Base):
 
 class PlayerFurnaceHistory(Base):
     __tablename__ = "player_furnace_history"
-    __table_args__ = (UniqueConstraint("player_id", "captured_at", name="uq_furnace_capture"),)
+    __table_args__ = (
+        UniqueConstraint("player_id", "captured_at", name="uq_furnace_capture"),
+        Index("idx_furnace_history_player_time", "player_id", "captured_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), index=True)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"))
     furnace_level: Mapped[int] = mapped_column(Integer)
     captured_at: Mapped[datetime] = mapped_column(TZDateTime, index=True)
     created_at: Mapped[datetime] = mapped_column(TZDateTime, server_default=func.now())
@@ -113,10 +128,10 @@ class EventStat(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), index=True)
-    event_type: Mapped[EventStatType] = mapped_column(SAEnum(EventStatType, name="event_stat_type"), index=True)
+    event_type: Mapped[EventStatType] = mapped_column(SAEnum(EventStatType, name="event_stat_type", native_enum=False), index=True)
     metric_name: Mapped[str] = mapped_column(String(64))
     metric_value: Mapped[Numeric] = mapped_column(Numeric(18, 2))
-    payload: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    payload: Mapped[dict[str, Any] | None] = mapped_column(JSONPayload, nullable=True)
     captured_at: Mapped[datetime] = mapped_column(TZDateTime, default=func.now(), index=True)
 
     player: Mapped[Player] = relationship(back_populates="events")
@@ -129,10 +144,21 @@ class AiOcrResult(Base):
     screenshot_path: Mapped[str] = mapped_column(String(512))
     model_name: Mapped[str] = mapped_column(String(64))
     card_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONPayload)
     created_at: Mapped[datetime] = mapped_column(TZDateTime, server_default=func.now())
 
 
+class ProcessedFile(Base):
+    __tablename__ = "processed_files"
+    __table_args__ = (UniqueConstraint("sha256", name="uq_processed_files_sha256"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    path: Mapped[str] = mapped_column(String(512))
+    sha256: Mapped[str] = mapped_column(String(64))
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONPayload, nullable=True)
+    processed_at: Mapped[datetime] = mapped_column(TZDateTime, server_default=func.now())
+
+
 class BearEvent(Base):
     __tablename__ = "bear_events"
 
@@ -152,9 +178,13 @@ class BearEvent(Base):
 
 class BearScore(Base):
     __tablename__ = "bear_scores"
+    __table_args__ = (
+        # Leads with bear_event_id, so it also serves the FK lookups
+        Index("idx_bear_scores_event_player", "bear_event_id", "player_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    bear_event_id: Mapped[int] = mapped_column(ForeignKey("bear_events.id", ondelete="CASCADE"), index=True)
+    bear_event_id: Mapped[int] = mapped_column(ForeignKey("bear_events.id", ondelete="CASCADE"))
     player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), index=True)
     score: Mapped[int] = mapped_column(Integer)
     rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
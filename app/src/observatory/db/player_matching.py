@@ -3,6 +3,10 @@ from __future__ import annotations
 
 import difflib
 import logging
+import math
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 from sqlalchemy import select
@@ -49,11 +53,33 @@ def fuzzy_match_player(
     stmt = select(models.Player).where(models.Player.alliance_id == alliance_id)
     all_players = session.execute(stmt).scalars().all()
 
-    if not all_players:
+    return match_player_name(player_name, all_players, threshold)
+
+
+def match_player_name(
+    player_name: str,
+    players: Sequence[models.Player],
+    threshold: float = FUZZY_MATCH_THRESHOLD
+) -> tuple[models.Player | None, float]:
+    """
+    Fuzzy-match a name against players that are already loaded.
+
+    Same scoring as fuzzy_match_player() without touching the database, so
+    callers matching many names can load the alliance's players once.
+
+    Args:
+        player_name: The OCR-extracted player name to match
+        players: Candidate players
+        threshold: Minimum similarity score (0.0-1.0) to accept a match
+
+    Returns:
+        Tuple of (matched_player, similarity_score) or (None, 0.0) if no match found
+    """
+    if not players:
         return (None, 0.0)
 
     # Build list of (player, name) tuples
-    player_names = [(p, p.name) for p in all_players]
+    player_names = [(p, p.name) for p in players]
 
     # Find close matches using difflib
     names_only = [name for _, name in player_names]
@@ -74,6 +100,93 @@ def fuzzy_match_player(
     return (matched_player, similarity)
 
 
+@lru_cache(maxsize=4096)
+def _name_matcher(name2: str) -> difflib.SequenceMatcher:
+    """SequenceMatcher with name2 as its second sequence, which difflib indexes."""
+    matcher = difflib.SequenceMatcher(None, autojunk=False)
+    matcher.set_seq2(name2)
+    return matcher
+
+
+@lru_cache(maxsize=65536)
+def name_similarity(name1: str, name2: str) -> float:
+    """
+    difflib ratio of two names (0.0-1.0), memoized.
+
+    This is the one scorer the duplicate merge scripts use, so which players
+    get merged doesn't depend on optional packages being installed.
+
+    The key keeps the call order: difflib's ratio is not symmetric (the
+    matching blocks it finds depend on which side is scanned), so sorting the
+    pair would change scores. For the same reason name2 stays the second
+    sequence; its index is built once per name and reused, only the first
+    sequence is swapped in. autojunk is off: its popular-character heuristic
+    is meant for long sequences, not names.
+
+    Args:
+        name1: First name (already normalized, e.g. lowercased)
+        name2: Second name
+
+    Returns:
+        Similarity ratio
+    """
+    if name1 == name2:
+        # Re-imported duplicates: no need to index either name
+        return 1.0
+    matcher = _name_matcher(name2)
+    matcher.set_seq1(name1)
+    return matcher.ratio()
+
+
+def candidate_name_pairs(names: Sequence[str], threshold: float) -> dict[int, list[int]]:
+    """
+    Map each index to the later indices whose names could reach threshold.
+
+    Both difflib's and rapidfuzz's ratio compute 2*M / (len1 + len2), where M
+    (matched characters) can never exceed the number of characters the two
+    names share. Treating each name as a set of (char, occurrence) tokens, a
+    pair can only reach the threshold if it shares at least
+    ceil(threshold * n / (2 - threshold)) tokens, so it is enough to index
+    each name's rarest tokens (a prefix filter): pairs with no rare token in
+    common are skipped without losing any match.
+
+    Args:
+        names: Names to compare (already normalized, e.g. lowercased)
+        threshold: Minimum similarity score (0.0-1.0) a pair must be able to reach
+
+    Returns:
+        Dict of index -> sorted later indices worth scoring; indices without
+        candidates are absent
+    """
+    if threshold <= 0:
+        return {i: list(range(i + 1, len(names))) for i in range(len(names))}
+
+    token_lists = []
+    for name in names:
+        seen = Counter()
+        tokens = []
+        for char in name:
+            tokens.append((char, seen[char]))
+            seen[char] += 1
+        token_lists.append(tokens)
+
+    frequency = Counter(token for tokens in token_lists for token in tokens)
+    index = defaultdict(list)
+    candidates = defaultdict(set)
+
+    for i, tokens in enumerate(token_lists):
+        tokens.sort(key=lambda token: (frequency[token], token))
+        # The epsilon keeps float error (0.8 * 3 / 1.2 = 2.0000000000000004)
+        # from rounding the bound up and dropping a pair exactly at threshold
+        min_overlap = math.ceil(threshold * len(tokens) / (2 - threshold) - 1e-9)
+        for token in tokens[:len(tokens) - min_overlap + 1]:
+            for j in index[token]:
+                candidates[j].add(i)
+            index[token].append(i)
+
+    return {i: sorted(later) for i, later in candidates.items()}
+
+
 def find_player_with_fuzzy_fallback(
     session: Session,
     alliance_id: int,
@@ -0,0 +1,41 @@
+"""Checkpoints for bulk screenshot processing, keyed by file contents."""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex SHA-256 digest of a file's contents."""
+    with path.open("rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def load_processed_digests(session: Session) -> frozenset[str]:
+    """
+    Return the digests of every file already processed.
+
+    Loaded once per run, so checking a file before its OCR request is a set
+    lookup rather than a query.
+    """
+    return frozenset(session.execute(select(models.ProcessedFile.sha256)).scalars())
+
+
+def record_processed_file(session: Session, path: Path, digest: str, result: dict[str, Any]) -> None:
+    """
+    Record that a file was processed successfully.
+
+    Args:
+        session: Database session (committed here)
+        path: File that was processed
+        digest: SHA-256 of its contents, from file_sha256
+        result: Result returned by ScreenshotProcessor.process_screenshot
+    """
+    session.add(models.ProcessedFile(path=str(path), sha256=digest, result=result))
+    session.commit()
@@ -3,15 +3,30 @@ from __future__ import annotations
 
 from sqlalchemy import create_engine
 from collections.abc import Iterator
+from functools import lru_cache
 
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
 
 from ..settings import ensure_data_dir, settings
 
 ensure_data_dir()
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, connect_args=connect_args, future=True)
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Return the process-wide engine, so scripts and workers share one pool."""
+    url = make_url(settings.database_url)
+    connect_args = {"check_same_thread": False} if url.get_backend_name() == "sqlite" else {}
+    pool_args = {}
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        # Room for the concurrent upload workers; pre-ping drops connections
+        # the server closed while the pool sat idle
+        pool_args = {"pool_size": 8, "max_overflow": 16, "pool_pre_ping": True}
+    return create_engine(settings.database_url, connect_args=connect_args, future=True, **pool_args)
+
+
+engine = get_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True, class_=Session)
 
 
@@ -5,11 +5,22 @@ import base64
 import json
 import logging
 import os
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 from typing import Any
 
 import httpx
-from openai import OpenAI
+from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI
+from PIL import Image, ImageOps
+
+try:
+    # Optional: lets the HTTP client multiplex requests over one HTTP/2
+    # connection; without it requests use pooled HTTP/1.1 connections
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 DEFAULT_PROMPT = """
 You are an OCR + data extraction helper for the game Whiteout Survival.
@@ -275,6 +286,33 @@ No extra commentary.
 
 from ..db.session import SessionLocal
 from ..db import models
+from ..settings import settings
+
+# The vision API scales images to fit 2048x2048 before reading them, so any
+# pixels beyond that are uploaded only to be thrown away
+AI_IMAGE_MAX_SIDE = 2048
+
+
+def _encode_image(image_path: Path, data: bytes | None = None) -> str:
+    """
+    Base64-encode a screenshot for the vision API.
+
+    Callers that already read the file pass its bytes as data, so it isn't
+    read from disk a second time; image_path is then only used for the record.
+    Images larger than AI_IMAGE_MAX_SIDE are downscaled (as JPEG) first.
+    """
+    if data is None:
+        if not image_path.exists():
+            raise FileNotFoundError(image_path)
+        data = image_path.read_bytes()
+    with Image.open(BytesIO(data)) as img:
+        if max(img.size) > AI_IMAGE_MAX_SIDE:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            img.thumbnail((AI_IMAGE_MAX_SIDE, AI_IMAGE_MAX_SIDE), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            img.save(buffer, "JPEG", quality=90)
+            data = buffer.getvalue()
+    return base64.b64encode(data).decode("utf-8")
 
 
 class OpenAIVisionExtractor:
@@ -287,16 +325,23 @@ class OpenAIVisionExtractor:
         if not self.api_key:
             raise RuntimeError("OPENAI_API_KEY not set; cannot run AI OCR")
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            # The SDK's own pool limits, with at least one keep-alive
+            # connection per concurrent upload worker, so requests after the
+            # first skip the TLS handshake
+            limits = DEFAULT_CONNECTION_LIMITS
+            if (limits.max_keepalive_connections or 0) < settings.ai_ocr_concurrency:
+                limits = httpx.Limits(
+                    max_connections=limits.max_connections,
+                    max_keepalive_connections=settings.ai_ocr_concurrency,
+                    keepalive_expiry=limits.keepalive_expiry,
+                )
+            http_client = DefaultHttpxClient(http2=HTTP2_AVAILABLE, limits=limits)
+            self.client = OpenAI(api_key=self.api_key, http_client=http_client)
         except Exception as exc:  # pragma: no cover
             raise RuntimeError("Failed to initialise OpenAI client. Did you set OPENAI_API_KEY?") from exc
 
-    def extract_players(self, image_path: Path) -> list[dict[str, Any]]:
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+    def extract_players(self, image_path: Path, data: bytes | None = None) -> list[dict[str, Any]]:
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai(img_b64)
@@ -315,13 +360,9 @@ class OpenAIVisionExtractor:
         self._persist_result(image_path, payload)
         return players
 
-    def extract_bear_event(self, image_path: Path) -> dict[str, Any]:
+    def extract_bear_event(self, image_path: Path, data: bytes | None = None) -> dict[str, Any]:
         """Extract bear event data (trap ID, rankings, damage scores) from screenshot."""
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai_with_prompt(img_b64, BEAR_EVENT_PROMPT)
@@ -335,13 +376,9 @@ class OpenAIVisionExtractor:
         self._persist_result(image_path, payload)
         return payload
 
-    def extract_foundry_signup(self, image_path: Path) -> dict[str, Any]:
+    def extract_foundry_signup(self, image_path: Path, data: bytes | None = None) -> dict[str, Any]:
         """Extract foundry signup data (legion, players, status, votes) from screenshot."""
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai_with_prompt(img_b64, FOUNDRY_SIGNUP_PROMPT)
@@ -355,13 +392,9 @@ class OpenAIVisionExtractor:
         self._persist_result(image_path, payload)
         return payload
 
-    def extract_foundry_result(self, image_path: Path) -> dict[str, Any]:
+    def extract_foundry_result(self, image_path: Path, data: bytes | None = None) -> dict[str, Any]:
         """Extract foundry result data (player rankings and scores) from screenshot."""
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai_with_prompt(img_b64, FOUNDRY_RESULT_PROMPT)
@@ -375,13 +408,9 @@ class OpenAIVisionExtractor:
         self._persist_result(image_path, payload)
         return payload
 
-    def extract_ac_signup(self, image_path: Path) -> dict[str, Any]:
+    def extract_ac_signup(self, image_path: Path, data: bytes | None = None) -> dict[str, Any]:
         """Extract Alliance Championship signup data (players and AC power) from screenshot."""
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai_with_prompt(img_b64, AC_SIGNUP_PROMPT)
@@ -395,13 +424,9 @@ class OpenAIVisionExtractor:
         self._persist_result(image_path, payload)
         return payload
 
-    def extract_contribution(self, image_path: Path) -> dict[str, Any]:
+    def extract_contribution(self, image_path: Path, data: bytes | None = None) -> dict[str, Any]:
         """Extract contribution ranking data from screenshot."""
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai_with_prompt(img_b64, CONTRIBUTION_PROMPT)
@@ -415,13 +440,9 @@ class OpenAIVisionExtractor:
         self._persist_result(image_path, payload)
         return payload
 
-    def extract_alliance_power(self, image_path: Path) -> dict[str, Any]:
+    def extract_alliance_power(self, image_path: Path, data: bytes | None = None) -> dict[str, Any]:
         """Extract alliance power ranking data from screenshot."""
-        if not image_path.exists():
-            raise FileNotFoundError(image_path)
-
-        with image_path.open("rb") as fh:
-            img_b64 = base64.b64encode(fh.read()).decode("utf-8")
+        img_b64 = _encode_image(image_path, data)
 
         try:
             response_data = self._call_openai_with_prompt(img_b64, ALLIANCE_POWER_PROMPT)
@@ -577,3 +598,15 @@ class OpenAIVisionExtractor:
             raise RuntimeError(
                 f"Unexpected OCR error: {str(e)}"
             ) from e
+
+
+@lru_cache(maxsize=None)
+def get_extractor(model: str = "gpt-4.1-mini") -> OpenAIVisionExtractor:
+    """
+    Return the shared extractor for a model.
+
+    The OpenAI client is thread-safe and pools its HTTP connections, so
+    sharing one instance lets every processor and worker thread reuse warm
+    connections instead of each paying its own TLS handshakes.
+    """
+    return OpenAIVisionExtractor(model=model)
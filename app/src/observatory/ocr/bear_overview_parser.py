@@ -7,6 +7,48 @@ from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Band of the overview screen holding everything parsed here, as fractions of
+# the image (left, top, right, bottom): from the completion timestamp on the
+# banner down to the "[Hunting Trap N] Damage Ranking" header. The ranking
+# list below it is skipped.
+OVERVIEW_BAND = (0.0, 0.10, 1.0, 0.53)
+
+# Tesseract page segmentation for the cropped band: one block of text
+OVERVIEW_PSM = 6
+
+# Longest side, in pixels, screenshots are shrunk to before OCR. Phone
+# captures (e.g. 1080x2400) still keep the overview's text well above the
+# size Tesseract needs, at about half the pixels to read.
+OVERVIEW_MAX_SIDE = 1600
+
+# Labels only the overview screen shows; all are within OVERVIEW_WHITELIST
+OVERVIEW_MARKERS = ("hunting trap", "rallies", "alliance damage")
+
+# Characters Tesseract may emit for the band: those of the labels matched by
+# parse_bear_overview, plus the digits and separators of its values and of the
+# completion timestamp. Everything else in the band is noise to the parser.
+OVERVIEW_WHITELIST = "".join(
+    sorted(set("[Hunting Trap] Rallies: Total Alliance Damage:") - {" "} | set("0123456789,-"))
+)
+
+
+def overview_region(image):
+    """
+    Crop a PIL image to OVERVIEW_BAND.
+
+    Tesseract's cost grows with pixel area, so reading only this band is
+    several times cheaper than the full screenshot.
+    """
+    left, top, right, bottom = OVERVIEW_BAND
+    width, height = image.size
+    return image.crop((int(left * width), int(top * height), int(right * width), int(bottom * height)))
+
+
+def looks_like_overview(text: str) -> bool:
+    """Whether OCR text shows any of the overview's labels (cheap pre-filter)."""
+    normalized = " ".join(text.lower().split())
+    return any(marker in normalized for marker in OVERVIEW_MARKERS)
+
 
 def parse_bear_overview(text: str) -> dict[str, Any]:
     """
@@ -8,7 +8,7 @@ from typing import Any, Mapping
 
 from ..db.enums import ScreenshotType
 from ..settings import settings
-from .ai_client import OpenAIVisionExtractor
+from .ai_client import OpenAIVisionExtractor, get_extractor
 from .classifier import ClassificationResult
 from .dataset import ScreenshotSample
 
@@ -40,7 +40,7 @@ class AllianceMembersParser(ScreenshotParser):
         self._ai_extractor: OpenAIVisionExtractor | None = None
         if self._ai_enabled:
             try:
-                self._ai_extractor = OpenAIVisionExtractor(model=settings.ai_ocr_model)
+                self._ai_extractor = get_extractor(settings.ai_ocr_model)
             except Exception as exc:  # pragma: no cover
                 logger.warning("AI OCR initialisation failed, falling back to Tesseract: %s", exc)
                 self._ai_enabled = False
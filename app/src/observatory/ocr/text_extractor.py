@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import logging
 import shutil
+import threading
 from abc import ABC, abstractmethod
 
 from PIL import Image, ImageOps
@@ -12,10 +13,63 @@ try:  # pragma: no cover
 except Exception:  # pragma: no cover
     pytesseract = None  # type: ignore
 
+try:  # pragma: no cover
+    # Optional: the Tesseract C API, with models loaded once per process
+    # instead of once per image by a tesseract subprocess
+    from tesserocr import PyTessBaseAPI
+except Exception:  # pragma: no cover
+    PyTessBaseAPI = None  # type: ignore
+
 from .image_loader import LoadedImage
 
 logger = logging.getLogger(__name__)
 
+# tesserocr API handles are not thread-safe, so each thread keeps its own,
+# one per (lang, psm)
+_apis = threading.local()
+
+
+def tesseract_available() -> bool:
+    """Whether image_to_text can run Tesseract (C API or binary)."""
+    return PyTessBaseAPI is not None or (pytesseract is not None and bool(shutil.which("tesseract")))
+
+
+def image_to_text(
+    image: Image.Image,
+    *,
+    lang: str = "eng",
+    psm: int = 3,
+    whitelist: str | None = None,
+) -> str:
+    """
+    OCR a PIL image with Tesseract.
+
+    Uses a reused tesserocr handle when tesserocr is installed, so repeated
+    calls skip the subprocess fork and model load; otherwise runs pytesseract.
+    When whitelist is given, Tesseract only emits those characters (it must
+    not contain whitespace).
+
+    Raises:
+        RuntimeError: Neither tesserocr nor pytesseract is installed
+    """
+    if PyTessBaseAPI is not None:
+        handles = getattr(_apis, "handles", None)
+        if handles is None:
+            handles = _apis.handles = {}
+        api = handles.get((lang, psm))
+        if api is None:
+            api = handles[lang, psm] = PyTessBaseAPI(lang=lang, psm=psm)
+        # Variables stick to the handle, so reset the whitelist on every call
+        api.SetVariable("tessedit_char_whitelist", whitelist or "")
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    if pytesseract is None:
+        raise RuntimeError("Tesseract OCR needs the pytesseract package (or tesserocr); neither is installed")
+    config = f"--psm {psm}"
+    if whitelist:
+        config += f" -c tessedit_char_whitelist={whitelist}"
+    return pytesseract.image_to_string(image, lang=lang, config=config)
+
 
 class TextExtractor(ABC):
     """Abstract text extractor interface."""
@@ -47,16 +101,15 @@ class TesseractTextExtractor(TextExtractor):
         self.lang_secondary = lang_secondary or lang_primary
         self.psm_primary = psm_primary
         self.psm_secondary = psm_secondary
-        self._binary_available = bool(shutil.which("tesseract"))
-        if pytesseract is None or not self._binary_available:
+        self._available = tesseract_available()
+        if not self._available:
             logger.warning("Tesseract binary or pytesseract missing; text extraction disabled")
 
     def _run_ocr(self, image: Image.Image, *, lang: str, psm: int) -> str:
-        config = f"--psm {psm}"
-        return pytesseract.image_to_string(image, lang=lang, config=config)
+        return image_to_text(image, lang=lang, psm=psm)
 
     def extract(self, loaded: LoadedImage) -> str:
-        if pytesseract is None or not self._binary_available:
+        if not self._available:
             return ""
         try:
             img = ImageOps.autocontrast(loaded.image.convert("L"))
@@ -71,6 +124,6 @@ class TesseractTextExtractor(TextExtractor):
 
 
 def default_text_extractor() -> TextExtractor:
-    if pytesseract is None or not shutil.which("tesseract"):
+    if not tesseract_available():
         return NoopTextExtractor()
     return TesseractTextExtractor()
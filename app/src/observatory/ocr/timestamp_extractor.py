@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import logging
 import re
+from io import BytesIO
 from datetime import datetime
 from pathlib import Path
 
@@ -20,7 +21,7 @@ FILENAME_TIMESTAMP_PATTERN = re.compile(
 )
 
 
-def extract_timestamp(image_path: Path) -> datetime | None:
+def extract_timestamp(image_path: Path, data: bytes | None = None) -> datetime | None:
     """
     Extract timestamp from screenshot, trying multiple methods.
 
@@ -33,6 +34,8 @@ def extract_timestamp(image_path: Path) -> datetime | None:
 
     Args:
         image_path: Path to screenshot file
+        data: The file's contents, if already read; EXIF is then parsed from
+            these bytes instead of reopening the file
 
     Returns:
         datetime in UTC, or None if extraction failed
@@ -44,7 +47,7 @@ def extract_timestamp(image_path: Path) -> datetime | None:
         return _localize_and_convert_utc(timestamp)
 
     # Fallback to EXIF
-    timestamp = _extract_from_exif(image_path)
+    timestamp = _extract_from_exif(image_path, data)
     if timestamp:
         logger.debug(f"Extracted timestamp from EXIF: {timestamp}")
         return _localize_and_convert_utc(timestamp)
@@ -79,18 +82,19 @@ def _extract_from_filename(image_path: Path) -> datetime | None:
         return None
 
 
-def _extract_from_exif(image_path: Path) -> datetime | None:
+def _extract_from_exif(image_path: Path, data: bytes | None = None) -> datetime | None:
     """
     Extract timestamp from EXIF data.
 
     Args:
         image_path: Path to screenshot
+        data: Contents of the screenshot, read instead of image_path when given
 
     Returns:
         Naive datetime (no timezone) or None
     """
     try:
-        with Image.open(image_path) as img:
+        with Image.open(BytesIO(data) if data is not None else image_path) as img:
             exif_data = img.getexif()
             if not exif_data:
                 return None
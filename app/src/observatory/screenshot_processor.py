@@ -10,18 +10,30 @@ from typing import Any
 from sqlalchemy.orm import Session
 
 from .db import models
-from .ocr.ai_client import OpenAIVisionExtractor
+from .ocr.ai_client import get_extractor
 from .ocr.timestamp_extractor import extract_timestamp
 
 logger = logging.getLogger(__name__)
 
+# AI extractor method for each screenshot type it reads; bear overviews are
+# read with Tesseract while saving instead
+AI_EXTRACT_METHODS = {
+    "alliance_members": "extract_players",
+    "bear_damage": "extract_bear_event",
+    "foundry_signup": "extract_foundry_signup",
+    "foundry_result": "extract_foundry_result",
+    "ac_signup": "extract_ac_signup",
+    "contribution": "extract_contribution",
+    "alliance_power": "extract_alliance_power",
+}
+
 
 class ScreenshotProcessor:
     """Processes screenshots and saves data to database."""
 
     def __init__(self, alliance_id: int = 1):
         self.alliance_id = alliance_id
-        self.extractor = OpenAIVisionExtractor(model="gpt-4o-mini")
+        self.extractor = get_extractor("gpt-4o-mini")
 
     def detect_screenshot_type(self, image_path: Path) -> dict[str, Any]:
         """
@@ -172,6 +184,16 @@ No extra commentary.
         Returns:
             Dict with processing results
         """
+        return self.save_extraction(session, self.extract(image_path, screenshot_type))
+
+    def extract(self, image_path: Path, screenshot_type: str | None = None) -> dict[str, Any]:
+        """
+        Run the OCR half of process_screenshot, without touching the database.
+
+        Safe to call from several threads at once; pass the result to
+        save_extraction (on one thread) to write it. OCR errors are kept in
+        the returned dict and reported by save_extraction.
+        """
         # Detect type if not provided
         detection_result = None
         if not screenshot_type:
@@ -184,6 +206,36 @@ No extra commentary.
             # Use timezone-aware UTC datetime to avoid comparison errors
             timestamp = datetime.now(pytz.UTC)
 
+        extraction = {
+            "image_path": image_path,
+            "type": screenshot_type,
+            "detection": detection_result,
+            "timestamp": timestamp,
+            "data": None,
+            "error": None,
+        }
+        method = AI_EXTRACT_METHODS.get(screenshot_type)
+        if method is not None:
+            try:
+                extraction["data"] = getattr(self.extractor, method)(image_path)
+            except Exception as e:
+                extraction["error"] = e
+        return extraction
+
+    def save_extraction(self, session: Session, extraction: dict[str, Any]) -> dict[str, Any]:
+        """
+        Save the output of extract() to the database and return the processing result.
+
+        Failures are reported in the result rather than raised; the exception
+        itself is kept under "error", so callers can tell a rate limit (worth
+        retrying) from bad data.
+        """
+        image_path = extraction["image_path"]
+        screenshot_type = extraction["type"]
+        detection_result = extraction["detection"]
+        timestamp = extraction["timestamp"]
+        data = extraction["data"]
+
         result = {
             "filename": image_path.name,
             "type": screenshot_type,
@@ -199,44 +251,47 @@ No extra commentary.
             result["detection_method"] = detection_result.get("method", "unknown")
 
         try:
+            if extraction["error"] is not None:
+                raise extraction["error"]
+
             if screenshot_type == "alliance_members":
-                records = self._process_alliance_members(session, image_path, timestamp)
+                records = self._process_alliance_members(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} alliance member(s)"
 
             elif screenshot_type == "bear_damage":
-                records = self._process_bear_damage(session, image_path, timestamp)
+                records = self._process_bear_damage(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} bear damage score(s)"
 
             elif screenshot_type == "foundry_signup":
-                records = self._process_foundry_signup(session, image_path, timestamp)
+                records = self._process_foundry_signup(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} foundry signup(s)"
 
             elif screenshot_type == "foundry_result":
-                records = self._process_foundry_result(session, image_path, timestamp)
+                records = self._process_foundry_result(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} foundry result(s)"
 
             elif screenshot_type == "ac_signup":
-                records = self._process_ac_signup(session, image_path, timestamp)
+                records = self._process_ac_signup(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} AC signup(s)"
 
             elif screenshot_type == "contribution":
-                records = self._process_contribution(session, image_path, timestamp)
+                records = self._process_contribution(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} contribution record(s)"
 
             elif screenshot_type == "alliance_power":
-                records = self._process_alliance_power(session, image_path, timestamp)
+                records = self._process_alliance_power(session, image_path, timestamp, data)
                 result["records_saved"] = records
                 result["success"] = True
                 result["message"] = f"✓ Saved {records} alliance power record(s)"
@@ -269,6 +324,7 @@ No extra commentary.
                 }
             )
             result["message"] = f"✗ System error: Missing required component ({e}). Please contact support."
+            result["error"] = e
 
         except ValueError as e:
             logger.error(
@@ -281,6 +337,7 @@ No extra commentary.
                 }
             )
             result["message"] = f"✗ Data extraction failed: {str(e)}. Screenshot may be cropped or unclear."
+            result["error"] = e
 
         except Exception as e:
             error_type = type(e).__name__
@@ -301,6 +358,7 @@ No extra commentary.
                 result["message"] = f"✗ Database error. Please try again or contact support if the problem persists."
             else:
                 result["message"] = f"✗ Processing failed: {str(e)}"
+            result["error"] = e
 
         # Delete screenshot after successful processing if configured
         if result["success"] and self._should_delete_screenshot():
@@ -335,19 +393,17 @@ No extra commentary.
                 }
             )
 
-    def _process_alliance_members(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_alliance_members(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process alliance members screenshot."""
         from .db.operations import save_alliance_members_ocr
 
-        data = self.extractor.extract_players(image_path)
         result = save_alliance_members_ocr(session, self.alliance_id, data, timestamp)
         return result.get("players", 0)
 
-    def _process_bear_damage(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_bear_damage(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process bear damage screenshot."""
         from .db.bear_operations import save_bear_event_ocr
 
-        data = self.extractor.extract_bear_event(image_path)
         trap_id = data.get("trap_id", 1)
         players = data.get("players", [])
 
@@ -363,11 +419,10 @@ No extra commentary.
         )
         return len(players)
 
-    def _process_foundry_signup(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_foundry_signup(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process foundry signup screenshot."""
         from .db.foundry_operations import save_foundry_signup_ocr
 
-        data = self.extractor.extract_foundry_signup(image_path)
         legion_number = data.get("legion_number", 1)
         # Estimate event date as next Sunday from timestamp
         from datetime import timedelta
@@ -382,11 +437,10 @@ No extra commentary.
         )
         return result.get("signups", 0)
 
-    def _process_foundry_result(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_foundry_result(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process foundry result screenshot."""
         from .db.foundry_operations import save_foundry_result_ocr
 
-        data = self.extractor.extract_foundry_result(image_path)
         legion_number = data.get("legion_number", 1)
         players_data = data.get("players", [])
         # Results are from previous Sunday
@@ -400,11 +454,10 @@ No extra commentary.
         )
         return result.get("results", 0)
 
-    def _process_ac_signup(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_ac_signup(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process AC signup screenshot."""
         from .db.ac_operations import save_ac_signup_ocr
 
-        data = self.extractor.extract_ac_signup(image_path)
         # Week starts on Monday
         from datetime import timedelta
         days_since_monday = timestamp.weekday()
@@ -416,11 +469,10 @@ No extra commentary.
         )
         return result.get("signups", 0)
 
-    def _process_contribution(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_contribution(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process contribution screenshot."""
         from .db.contribution_operations import save_contribution_snapshot_ocr
 
-        data = self.extractor.extract_contribution(image_path)
         # Week starts on Monday
         from datetime import timedelta
         days_since_monday = timestamp.weekday()
@@ -432,11 +484,10 @@ No extra commentary.
         )
         return result.get("snapshots", 0)
 
-    def _process_alliance_power(self, session: Session, image_path: Path, timestamp: datetime) -> int:
+    def _process_alliance_power(self, session: Session, image_path: Path, timestamp: datetime, data: Any) -> int:
         """Process alliance power screenshot."""
         from .db.alliance_power_operations import save_alliance_power_snapshot_ocr
 
-        data = self.extractor.extract_alliance_power(image_path)
         result = save_alliance_power_snapshot_ocr(
             session, timestamp, data.get("alliances", []), timestamp
         )
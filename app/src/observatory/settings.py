@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     ai_ocr_enabled: bool = Field(False, alias="AI_OCR_ENABLED")
     ai_ocr_model: str = Field("gpt-4o-mini", alias="AI_OCR_MODEL")
     ai_ocr_rate_limit_delay: int = Field(12, alias="AI_OCR_RATE_LIMIT_DELAY")
+    ai_ocr_concurrency: int = Field(4, alias="AI_OCR_CONCURRENCY")
+    ai_ocr_requests_per_minute: int = Field(20, alias="AI_OCR_REQUESTS_PER_MINUTE")
     screenshot_timezone: str = Field("America/New_York", alias="SCREENSHOT_TIMEZONE")
 
     # Screenshot cleanup settings
@@ -0,0 +1,47 @@
+"""Tests for the custom SQLAlchemy column types."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select, text
+
+from observatory.db.custom_types import TZDateTime
+
+
+def _events_table() -> Table:
+    return Table(
+        "events",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("at", TZDateTime()),
+    )
+
+
+def test_tzdatetime_round_trips_microseconds_on_sqlite() -> None:
+    engine = create_engine("sqlite://")
+    events = _events_table()
+    events.metadata.create_all(engine)
+    value = datetime(2025, 11, 19, 13, 45, 30, 123456, tzinfo=timezone(timedelta(hours=2)))
+
+    with engine.begin() as conn:
+        conn.execute(insert(events).values(id=1, at=value))
+        stored = conn.execute(text("SELECT at FROM events")).scalar_one()
+        loaded = conn.execute(select(events.c.at)).scalar_one()
+
+    assert stored == "2025-11-19T11:45:30.123456Z"
+    assert loaded == value
+    assert loaded.utcoffset() == timedelta(0)
+
+
+def test_tzdatetime_text_sorts_chronologically_on_sqlite() -> None:
+    engine = create_engine("sqlite://")
+    events = _events_table()
+    events.metadata.create_all(engine)
+    base = datetime(2025, 11, 19, 12, 0, tzinfo=timezone.utc)
+    values = [base + timedelta(microseconds=1), base, base - timedelta(hours=1), base + timedelta(seconds=1)]
+
+    with engine.begin() as conn:
+        conn.execute(insert(events), [{"id": i, "at": v} for i, v in enumerate(values)])
+        ordered = conn.execute(select(events.c.at).order_by(events.c.at)).scalars().all()
+
+    assert ordered == sorted(values)
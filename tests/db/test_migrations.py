@@ -0,0 +1,73 @@
+"""Tests for the Alembic environment (app/alembic/env.py)."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from observatory.db.models import Base
+from observatory.settings import settings
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "app" / "alembic"
+
+
+def _alembic_config() -> Config:
+    # No ini file, so env.py leaves the test run's logging alone
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    return config
+
+
+def test_upgrade_head_on_empty_database_creates_baseline(tmp_path, monkeypatch) -> None:
+    url = f"sqlite:///{tmp_path / 'observatory.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+    config = _alembic_config()
+
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    try:
+        assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+        with engine.connect() as conn:
+            version = conn.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+    finally:
+        engine.dispose()
+    assert version == ScriptDirectory.from_config(config).get_current_head()
+
+
+def test_normalize_sqlite_datetimes_keeps_microseconds(tmp_path, monkeypatch) -> None:
+    url = f"sqlite:///{tmp_path / 'observatory.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+    config = _alembic_config()
+
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO player_power_history (id, player_id, power, captured_at) VALUES
+                    (1, 1, 100, '2025-01-01T12:00:00.123456+00:00'),
+                    (2, 1, 100, '2025-01-01 12:00:00.123457'),
+                    (3, 1, 100, '2025-01-01 14:00:00.123456+02:00'),
+                    (4, 1, 100, '2025-01-01 13:00:00.5+01:00')
+            """))
+        command.stamp(config, "20251120_000012")
+
+        command.upgrade(config, "20251120_000013")
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT id, captured_at FROM player_power_history ORDER BY id")
+            ).all()
+    finally:
+        engine.dispose()
+    # Row 3 is the same instant as row 1 and is dropped; row 2 differs by
+    # one microsecond and is kept
+    assert [tuple(row) for row in rows] == [
+        (1, "2025-01-01T12:00:00.123456Z"),
+        (2, "2025-01-01T12:00:00.123457Z"),
+        (4, "2025-01-01T12:00:00.500000Z"),
+    ]
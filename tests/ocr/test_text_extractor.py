@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import threading
 from io import BytesIO
 
+import pytest
 from PIL import Image
 
 from observatory.ocr.image_loader import load_image
-from observatory.ocr.text_extractor import NoopTextExtractor, default_text_extractor
+from observatory.ocr.text_extractor import NoopTextExtractor, default_text_extractor, image_to_text
 
 
 def _make_image_bytes(size=(50, 50), color=(0, 0, 0), fmt="PNG") -> bytes:
@@ -23,6 +25,67 @@ def test_noop_text_extractor_returns_empty() -> None:
 
 def test_default_text_extractor_without_binary(monkeypatch) -> None:
     monkeypatch.setattr("observatory.ocr.text_extractor.shutil.which", lambda _: None)
+    monkeypatch.setattr("observatory.ocr.text_extractor.PyTessBaseAPI", None)
     loaded = load_image(_make_image_bytes())
     extractor = default_text_extractor()
     assert extractor.extract(loaded) == ""
+
+
+def test_image_to_text_passes_whitelist_to_pytesseract(monkeypatch) -> None:
+    calls = []
+
+    class FakePytesseract:
+        @staticmethod
+        def image_to_string(image, lang, config):
+            calls.append((lang, config))
+            return "Rallies: 50"
+
+    monkeypatch.setattr("observatory.ocr.text_extractor.PyTessBaseAPI", None)
+    monkeypatch.setattr("observatory.ocr.text_extractor.pytesseract", FakePytesseract)
+    image = Image.new("RGB", (50, 50))
+
+    assert image_to_text(image, psm=6, whitelist="0123456789:") == "Rallies: 50"
+    image_to_text(image)
+    assert calls == [
+        ("eng", "--psm 6 -c tessedit_char_whitelist=0123456789:"),
+        ("eng", "--psm 3"),
+    ]
+
+
+def test_image_to_text_reuses_tesserocr_handle(monkeypatch) -> None:
+    created = []
+
+    class FakeTessBaseAPI:
+        def __init__(self, lang, psm):
+            self.key = (lang, psm)
+            self.variables = {}
+            created.append(self)
+
+        def SetVariable(self, name, value):
+            self.variables[name] = value
+
+        def SetImage(self, image):
+            self.image = image
+
+        def GetUTF8Text(self):
+            return f"{self.key} {self.variables['tessedit_char_whitelist']!r}"
+
+    monkeypatch.setattr("observatory.ocr.text_extractor._apis", threading.local())
+    monkeypatch.setattr("observatory.ocr.text_extractor.PyTessBaseAPI", FakeTessBaseAPI)
+    monkeypatch.setattr("observatory.ocr.text_extractor.pytesseract", None)
+    image = Image.new("RGB", (50, 50))
+
+    assert image_to_text(image, psm=6, whitelist="0123456789:") == "('eng', 6) '0123456789:'"
+    # Same (lang, psm): the handle is reused and its whitelist is cleared
+    assert image_to_text(image, psm=6) == "('eng', 6) ''"
+    assert image_to_text(image) == "('eng', 3) ''"
+    assert [api.key for api in created] == [("eng", 6), ("eng", 3)]
+    assert created[1].image is image
+
+
+def test_image_to_text_without_tesseract_packages(monkeypatch) -> None:
+    monkeypatch.setattr("observatory.ocr.text_extractor.PyTessBaseAPI", None)
+    monkeypatch.setattr("observatory.ocr.text_extractor.pytesseract", None)
+
+    with pytest.raises(RuntimeError, match="pytesseract"):
+        image_to_text(Image.new("RGB", (50, 50)))
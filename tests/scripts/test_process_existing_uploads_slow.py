@@ -0,0 +1,96 @@
+"""Tests for the pacing helpers in app/scripts/process_existing_uploads_slow.py."""
+from __future__ import annotations
+
+import importlib.util
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[2] / "app" / "scripts" / "process_existing_uploads_slow.py"
+
+
+@pytest.fixture(scope="module")
+def slow():
+    spec = importlib.util.spec_from_file_location("process_existing_uploads_slow", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _rate_limit_error(headers: dict[str, str]) -> Exception:
+    response = httpx.Response(
+        429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    )
+    error = openai.RateLimitError("Rate limit reached", response=response, body=None)
+    # Wrapped the way the AI client reports it
+    try:
+        raise RuntimeError("OCR service rate limit reached.") from error
+    except RuntimeError as wrapped:
+        return wrapped
+
+
+def test_retry_after_reads_headers_through_wrapping_errors(slow) -> None:
+    assert slow.retry_after(_rate_limit_error({"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    assert slow.retry_after(_rate_limit_error({"retry-after": "7"})) == 7.0
+
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    wait = slow.retry_after(_rate_limit_error({"retry-after": format_datetime(when, usegmt=True)}))
+    assert 25 <= wait <= 30
+
+
+def test_retry_after_defaults_without_usable_header(slow) -> None:
+    assert slow.retry_after(_rate_limit_error({})) == slow.DEFAULT_RETRY_AFTER
+    assert slow.retry_after(_rate_limit_error({"retry-after": "soon"}), default=5.0) == 5.0
+    assert slow.retry_after(ValueError("bad data"), default=5.0) == 5.0
+
+
+def test_is_rate_limited(slow) -> None:
+    assert slow.is_rate_limited(_rate_limit_error({}))
+    assert not slow.is_rate_limited(ValueError("bad data"))
+    assert not slow.is_rate_limited(None)
+
+
+def test_request_bucket_paces_to_the_budget(slow, monkeypatch) -> None:
+    clock = FakeClock()
+    monkeypatch.setattr(slow.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(slow.time, "sleep", clock.sleep)
+    bucket = slow.RequestBucket(per_minute=30)
+
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(2.0)]
+
+    # Time spent working counts towards the next slot
+    clock.now += 1.5
+    bucket.acquire()
+    assert clock.sleeps[-1] == pytest.approx(0.5)
+
+
+def test_request_bucket_pause_empties_the_bucket(slow, monkeypatch) -> None:
+    clock = FakeClock()
+    monkeypatch.setattr(slow.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(slow.time, "sleep", clock.sleep)
+    bucket = slow.RequestBucket(per_minute=60)
+
+    clock.now += 10
+    bucket.pause(7.0)
+    bucket.acquire()
+    assert clock.sleeps == [7.0, pytest.approx(1.0)]